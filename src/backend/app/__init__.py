@@ -2,6 +2,7 @@ from flask import Flask, session
 from datetime import timedelta
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from werkzeug.middleware.proxy_fix import ProxyFix
 from .config import Config
 import os
 
@@ -10,7 +11,14 @@ db = SQLAlchemy()
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    # orjson-backed when available; see app/services/json_provider.py
+    from app.services.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
+    # request.remote_addr is the client, not the platform router, for the login IP limit
+    hops = app.config.get("TRUSTED_PROXY_HOPS", 0)
+    if hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
 
     
     app.permanent_session_lifetime = timedelta(minutes=30)
@@ -20,6 +28,10 @@ def create_app():
     def make_session_not_permanent():
         session.permanent = False
 
+    # Request latency and SQL counts for /metrics
+    from app.services import instrumentation
+    instrumentation.init_app(app)
+
     # Register your blueprints
     from app.routes.auth import auth_bp
     app.register_blueprint(auth_bp)
@@ -48,6 +60,9 @@ def create_app():
     from app.routes.cron import cron_bp
     app.register_blueprint(cron_bp)
 
+    from app.routes.metrics import metrics_bp
+    app.register_blueprint(metrics_bp)
+
     frontend_url = os.getenv("FRONTEND_URL")  
     CORS(
         app,
@@ -60,4 +75,25 @@ def create_app():
     # Initialize the database
     db.init_app(app)
 
+    from app.services import compression
+    compression.init_app(app)
+
+    from app.services import mail_queue
+    mail_queue.init_app(app)
+
+    from app.services import passwords
+    passwords.init_app(app)
+
+    from app.commands import register_commands
+    register_commands(app)
+
+    # Evict local caches when another node changes datasets or question sets.
+    # Started lazily so each (possibly forked) worker gets its own thread.
+    from app.services import cache_bus
+
+    @app.before_request
+    def start_cache_listener():
+        if app.config.get("CACHE_LISTENER_ENABLED"):
+            cache_bus.start_listener(app)
+
     return app
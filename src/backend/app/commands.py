@@ -0,0 +1,243 @@
+# app/commands.py
+"""Admin commands, run with ``flask --app run <command>``."""
+import os
+import subprocess
+import sys
+import click
+
+# Modules that must not be imported just to build the app; they are loaded on
+# first use by the endpoints that need them.
+HEAVY_MODULES = ("numpy", "pandas", "sklearn", "pyarrow")
+DEFAULT_STARTUP_BUDGET_MS = 1500
+
+_STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+create_app()
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed, "modules": sorted(m for m in sys.modules if "." not in m)}))
+"""
+
+
+def register_commands(app):
+
+    @app.cli.command("import-dataset")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--name", "data_set_name", required=True, help="Name of the new dataset.")
+    @click.option("--question-set-id", required=True, type=int)
+    @click.option("--description", default=None)
+    @click.option("--format", "file_format", type=click.Choice(["csv", "parquet"]), default=None,
+                  help="Defaults to the file extension.")
+    @click.option("--chunk-size", default=50_000, show_default=True, help="Rows validated and copied at a time.")
+    @click.option("--train/--no-train", default=True, show_default=True, help="Select best_k after importing.")
+    def import_dataset_command(path, data_set_name, question_set_id, description, file_format, chunk_size, train):
+        """Import stem/abm/humss/strand rows from a CSV or Parquet file as a new dataset."""
+        from app.services.dataset_import import import_dataset
+        from app.services.k_selection import select_best_k
+
+        file_format = file_format or ("parquet" if path.lower().endswith(".parquet") else "csv")
+        result = import_dataset(
+            path, data_set_name, question_set_id, description=description,
+            file_format=file_format, chunk_size=chunk_size,
+            progress=lambda rows: click.echo(f"Copied {rows} rows"),
+        )
+        click.echo(f"Created dataset {result['data_set_id']} with {result['rows']} rows")
+
+        if train:
+            trained = select_best_k(result["data_set_id"])
+            click.echo(f"best_k={trained['best_k']} accuracy={trained['accuracy']:.4f}")
+
+    @app.cli.command("rescore-dataset")
+    @click.argument("data_set_id", type=int)
+    @click.option("--chunk-size", default=500, show_default=True, help="Assessments scored per transaction.")
+    def rescore_dataset_command(data_set_id, chunk_size):
+        """Re-score all completed assessments of a dataset."""
+        from app.services.rescoring import rescore_dataset
+
+        def progress(done, total=None):
+            click.echo(f"Rescored {done}/{total if total is not None else '?'} assessments")
+
+        result = rescore_dataset(data_set_id, chunk_size=chunk_size, progress=progress)
+        click.echo(f"Done: {result['rescored']} assessments rescored for dataset {data_set_id}")
+
+    @app.cli.command("train-dataset")
+    @click.argument("data_set_id", type=int)
+    @click.option("--k-min", default=1, show_default=True)
+    @click.option("--k-max", default=30, show_default=True)
+    @click.option("--folds", default=5, show_default=True)
+    @click.option("--workers", default=None, type=int, help="Process pool size (default: one per fold).")
+    def train_dataset_command(data_set_id, k_min, k_max, folds, workers):
+        """Cross-validate k for a dataset and store best_k and accuracy."""
+        from app.services.k_selection import select_best_k
+
+        def progress(done, total=None):
+            click.echo(f"Scored {done}/{total if total is not None else '?'} folds")
+
+        result = select_best_k(
+            data_set_id, k_values=range(k_min, k_max + 1), folds=folds,
+            workers=workers, progress=progress,
+        )
+        click.echo(f"Done: best_k={result['best_k']} accuracy={result['accuracy']:.4f}")
+
+    @app.cli.command("build-lookup")
+    @click.argument("data_set_id", type=int)
+    @click.option("--max-cells", default=None, type=int, help="Refuse to build larger cubes (default: KNN_LOOKUP_MAX_CELLS).")
+    def build_lookup_command(data_set_id, max_cells):
+        """Precompute the recommendation lookup cube for a dataset."""
+        from flask import current_app
+        from app.services.lookup_cube import build_lookup
+
+        def progress(done, total=None):
+            click.echo(f"Scored {done}/{total if total is not None else '?'} cells")
+
+        info = build_lookup(
+            data_set_id, max_cells=max_cells or current_app.config.get("KNN_LOOKUP_MAX_CELLS"),
+            progress=progress,
+        )
+        click.echo(f"Done: {info['bytes']} bytes for dataset {data_set_id}")
+
+    @app.cli.command(
+        "db", add_help_option=False,
+        context_settings={"ignore_unknown_options": True, "allow_extra_args": True},
+    )
+    @click.pass_context
+    def db_command(ctx):
+        """Schema migrations (Flask-Migrate), e.g. `db upgrade`."""
+        # Flask-Migrate pulls in alembic, so load it only for this command
+        # instead of on every app start.
+        from flask_migrate import Migrate, cli
+        from app import db
+
+        Migrate(app, db)
+        cli.db.main(args=ctx.args, prog_name=ctx.command_path, obj=ctx.obj)
+
+    @app.cli.command("check-startup")
+    @click.option("--budget-ms", default=DEFAULT_STARTUP_BUDGET_MS, show_default=True,
+                  help="Fail if importing and creating the app takes longer than this.")
+    @click.option("--runs", default=3, show_default=True, help="Best of this many cold interpreters.")
+    def check_startup_command(budget_ms, runs):
+        """Fail if cold start regresses: over budget, or heavy libraries imported eagerly."""
+        import json
+
+        timings = []
+        for _ in range(runs):
+            probe = subprocess.run(
+                [sys.executable, "-c", _STARTUP_PROBE],
+                capture_output=True, text=True, cwd=os.path.dirname(app.root_path),
+            )
+            if probe.returncode != 0:
+                raise click.ClickException(f"App failed to start:\n{probe.stderr}")
+            report = json.loads(probe.stdout.strip().splitlines()[-1])
+            timings.append(report["ms"])
+
+        eager = [m for m in HEAVY_MODULES if m in report["modules"]]
+        best = min(timings)
+        click.echo(f"Startup: {best:.0f} ms (budget {budget_ms} ms)")
+        if eager:
+            raise click.ClickException(f"Imported at startup: {', '.join(eager)}")
+        if best > budget_ms:
+            raise click.ClickException(f"Startup took {best:.0f} ms, over the {budget_ms} ms budget")
+        click.echo("OK")
+
+    @app.cli.command("check-indexes")
+    @click.option("--sample-id", default=1, show_default=True, help="Id bound into each query.")
+    def check_indexes_command(sample_id):
+        """EXPLAIN each hot query and fail if it doesn't use its index."""
+        from app.services.index_check import check_indexes
+
+        try:
+            report = check_indexes(sample_id)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+        missing = 0
+        for name, expected, used, ok in report:
+            click.echo(f"{'OK ' if ok else 'MISSING'} {name}: expected {expected}, plan uses {', '.join(used) or 'no index'}")
+            missing += not ok
+        if missing:
+            raise click.ClickException(f"{missing} hot queries don't use their index; run `flask --app run db upgrade`")
+
+    @app.cli.command("bench-payloads")
+    @click.option("--data-set-id", type=int, required=True)
+    @click.option("--question-set-id", type=int, required=True)
+    @click.option("--limit", default=10_000, show_default=True, help="Records per page to benchmark.")
+    @click.option("--repeat", default=20, show_default=True)
+    def bench_payloads_command(data_set_id, question_set_id, limit, repeat):
+        """Compare JSON encoders and response encodings on large payloads."""
+        import time
+        from flask.json.provider import DefaultJSONProvider
+        from app.services import compression, json_provider
+
+        encoders = {"stdlib": DefaultJSONProvider(app)}
+        if json_provider.orjson is not None:
+            encoders["orjson"] = json_provider.FastJSONProvider(app)
+        encodings = ["gzip"] + (["br"] if compression._brotli_module() else [])
+
+        def best_ms(fn):
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn()
+                times.append(time.perf_counter() - start)
+            return min(times) * 1000
+
+        client = app.test_client()
+        urls = [
+            f"/datasets/{data_set_id}/records?limit={limit}",
+            f"/question-sets/{question_set_id}",
+        ]
+        for url in urls:
+            response = client.get(url, headers={"Accept-Encoding": "identity"})
+            if response.status_code != 200:
+                raise click.ClickException(f"GET {url} returned {response.status_code}")
+            payload = response.get_json()
+            click.echo(f"GET {url}")
+            for name, encoder in encoders.items():
+                with app.app_context():
+                    body = encoder.dumps(payload).encode()
+                    ms = best_ms(lambda: encoder.dumps(payload))
+                click.echo(f"  {name:>6} encode: {ms:8.2f} ms  {len(body):>10,} bytes")
+            for encoding in encodings:
+                compressed = compression.compress_body(body, encoding)
+                ms = best_ms(lambda: compression.compress_body(body, encoding))
+                saved = 100 * (1 - len(compressed) / len(body))
+                click.echo(f"  {encoding:>6} +{ms:7.2f} ms  {len(compressed):>10,} bytes ({saved:.0f}% smaller)")
+
+    @app.cli.command("send-test-email")
+    @click.option("--to", required=True)
+    @click.option("--timeout", default=30.0, show_default=True, help="Seconds to wait for delivery.")
+    def send_test_email_command(to, timeout):
+        """Send one message through the mail queue and wait for its status."""
+        import time
+        from app.services import mail_queue
+
+        delivery_id = mail_queue.submit(to, "Strandify test email", "<p>Mail delivery works.</p>")
+        if delivery_id is None:
+            raise click.ClickException("Mail queue is full")
+        deadline = time.monotonic() + timeout
+        status = mail_queue.status(delivery_id)
+        while status["status"] not in ("sent", "failed") and time.monotonic() < deadline:
+            time.sleep(0.1)
+            status = mail_queue.status(delivery_id)
+        click.echo(f"{status['status']} after {status['attempts']} attempt(s)")
+        if status["status"] != "sent":
+            raise click.ClickException(status["error"] or "Timed out waiting for delivery")
+
+    @app.cli.command("import-roster")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--workers", default=None, type=int, help="Hashing processes; defaults to the CPU count.")
+    def import_roster_command(path, workers):
+        """Create USER accounts from an email/password/first_name/last_name/birthday CSV."""
+        from app.services.roster_import import import_roster
+
+        try:
+            result = import_roster(
+                path, workers=workers,
+                progress=lambda done, total=None: click.echo(f"Hashed {done}/{total} passwords"),
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        for error in result["errors"]:
+            click.echo(f"Row {error['row']} ({error['email']}): {error['error']}")
+        click.echo(f"Created {result['created']} accounts, skipped {len(result['errors'])} rows")
@@ -15,10 +15,42 @@ class Config:
     SENDER_EMAIL = os.getenv("SENDER_EMAIL")
     SMTP_SERVER = os.getenv("SMTP_SERVER")
     SMTP_PORT = os.getenv("SMTP_PORT")
+    SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+    APP_PASSWORD = os.getenv("APP_PASSWORD")  # Only for SMTP
+    SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
+    MAIL_WORKERS = int(os.getenv("MAIL_WORKERS", 2))
+    MAIL_QUEUE_SIZE = int(os.getenv("MAIL_QUEUE_SIZE", 1000))
+    MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", 4))
+    MAIL_RETRY_BACKOFF = float(os.getenv("MAIL_RETRY_BACKOFF", 1.0))  # seconds, doubled per retry
     VERCEL_LINK = os.getenv("VERCEL_LINK")
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SECURE = True 
     SESSION_COOKIE_SAMESITE = "None"
     FRONTEND_URL = os.getenv("FRONTEND_URL")
-    ALGORITHM = "HS256"
\ No newline at end of file
+    ALGORITHM = "HS256"
+    # Argon2 cost; existing hashes are upgraded on their next successful login
+    ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 3))
+    ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", 65536))  # KiB
+    ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", 4))
+    PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", os.cpu_count() or 2))
+    PASSWORD_QUEUE_SIZE = int(os.getenv("PASSWORD_QUEUE_SIZE", 64))
+    PASSWORD_VERIFY_TIMEOUT = float(os.getenv("PASSWORD_VERIFY_TIMEOUT", 5))  # seconds
+    LOGIN_EMAIL_PER_MINUTE = int(os.getenv("LOGIN_EMAIL_PER_MINUTE", 5))
+    LOGIN_IP_PER_MINUTE = int(os.getenv("LOGIN_IP_PER_MINUTE", 60))
+    # Proxies in front of the app whose X-Forwarded-For we trust, e.g. 1 behind a platform router;
+    # 0 (clients connect directly) unless set, so a forged header is never believed by default
+    TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", 0))
+    KNN_LOOKUP_ENABLED = os.getenv("KNN_LOOKUP_ENABLED", "false").lower() == "true"
+    CACHE_LISTENER_ENABLED = os.getenv("CACHE_LISTENER_ENABLED", "true").lower() == "true"
+    MODEL_STORE_DIR = os.getenv("MODEL_STORE_DIR")  # defaults to <instance>/models
+    KNN_LOOKUP_MAX_CELLS = int(os.getenv("KNN_LOOKUP_MAX_CELLS", 5_000_000))
+    # "packed" keeps neighbors as arrays on the Results row, "rows" writes one Neighbors row each
+    NEIGHBOR_STORAGE = os.getenv("NEIGHBOR_STORAGE", "packed")
+    RESULTS_CACHE_SIZE = int(os.getenv("RESULTS_CACHE_SIZE", 2048))
+    REFERENCE_CACHE_SIZE = int(os.getenv("REFERENCE_CACHE_SIZE", 256))
+    REFERENCE_CACHE_TTL = int(os.getenv("REFERENCE_CACHE_TTL", 60))  # seconds
+    TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10_000))
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 4096))
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 30))  # seconds
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))  # bytes
\ No newline at end of file
@@ -1,5 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import UniqueConstraint
+from sqlalchemy.dialects.postgresql import ARRAY
 from datetime import datetime
 from app import db
 
@@ -26,9 +27,9 @@ class User(db.Model):
             "first_name": self.first_name,
             "last_name": self.last_name,
             "affix": self.affix,
-            "date_joined": self.date_joined.isoformat(),
+            "date_joined": self.date_joined,
             "middle_name": self.middle_name,
-            "birthday": self.birthday.isoformat(),
+            "birthday": self.birthday,
             "role": self.role,
         }
 
@@ -51,13 +52,16 @@ class QuestionSet(db.Model):
             "question_set_id": self.question_set_id,
             "question_set_name": self.question_set_name,
             "description": self.description,
-            "created_at": self.created_at.isoformat(),
+            "created_at": self.created_at,
         }
 
 
 # -------------------- Question --------------------
 class Question(db.Model):
     __tablename__ = "questions"
+    __table_args__ = (
+        db.Index("ix_questions_set_id", "set_id"),
+    )
 
     question_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     question_text = db.Column(db.Text, nullable=False)
@@ -78,6 +82,10 @@ class Question(db.Model):
 # -------------------- DataSet --------------------
 class DataSet(db.Model):
     __tablename__ = "data_set"
+    __table_args__ = (
+        # Only one dataset is Active at a time; keeps /active-dataset a single probe
+        db.Index("ix_data_set_active", "data_set_id", postgresql_where=db.text("status = 'Active'")),
+    )
 
     data_set_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
     created_at = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), nullable=False)
@@ -109,11 +117,11 @@ class DataSet(db.Model):
     def data_set_info(self):
         return {
             "data_set_id": self.data_set_id,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "created_at": self.created_at,
             "data_set_name": self.data_set_name,
             "question_set_id": self.question_set_id,
             "data_set_description": self.data_set_description,
-            "last_updated": self.last_updated.isoformat() if self.last_updated else None,
+            "last_updated": self.last_updated,
             "status": self.status,
             "best_k": self.best_k,
             "accuracy": self.accuracy,
@@ -121,9 +129,45 @@ class DataSet(db.Model):
 
 
 
+# -------------------- DataSet Lookup --------------------
+class DataSetLookup(db.Model):
+    """Precomputed recommendation cube for every reachable strand-total triple."""
+    __tablename__ = "data_set_lookup"
+
+    data_set_id = db.Column(
+        db.BigInteger,
+        db.ForeignKey("data_set.data_set_id", onupdate="CASCADE", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # DataSet.last_updated and best_k the cube was built from
+    version = db.Column(db.DateTime(timezone=True), nullable=False)
+    best_k = db.Column(db.BigInteger, nullable=False)
+    stem_max = db.Column(db.Integer, nullable=False)
+    abm_max = db.Column(db.Integer, nullable=False)
+    humss_max = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.LargeBinary, nullable=False)  # np.savez_compressed arrays
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    def lookup_info(self):
+        return {
+            "data_set_id": self.data_set_id,
+            "version": self.version,
+            "best_k": self.best_k,
+            "stem_max": self.stem_max,
+            "abm_max": self.abm_max,
+            "humss_max": self.humss_max,
+            "bytes": len(self.payload) if self.payload else 0,
+            "created_at": self.created_at,
+        }
+
+
 # -------------------- Data --------------------
 class Data(db.Model):
     __tablename__ = "data"
+    __table_args__ = (
+        # Training loads and record pages read a dataset in data_id order
+        db.Index("ix_data_data_set_id_data_id", "data_set_id", "data_id"),
+    )
 
     data_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     data_set_id = db.Column(
@@ -160,13 +204,21 @@ class Course(db.Model):
         return {
             "course_id": self.course_id,
             "course_name": self.course_name,
-            "created_at": self.created_at.isoformat(),
+            "created_at": self.created_at,
         }
 
 
 # -------------------- Assessment --------------------
 class Assessment(db.Model):
     __tablename__ = "assessments"
+    __table_args__ = (
+        db.Index("ix_assessments_user_id_data_set_id", "user_id", "data_set_id"),
+        # Rescoring walks a dataset's completed assessments in id order
+        db.Index(
+            "ix_assessments_completed_data_set_id", "data_set_id", "assessment_id",
+            postgresql_where=db.text("completed"),
+        ),
+    )
 
     assessment_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user_data.user_id"))
@@ -183,6 +235,10 @@ class Assessment(db.Model):
     stem_total = db.Column(db.Float, nullable=False, default=0.0)
     abm_total = db.Column(db.Float, nullable=False, default=0.0)
     humss_total = db.Column(db.Float, nullable=False, default=0.0)
+    # Kept up to date by answer saves so an autosave needs no lookups:
+    # the dataset's question set, and how many of its questions are answered
+    question_set_id = db.Column(db.Integer, nullable=True)
+    answered_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     def assessment_info(self):
         return {
@@ -196,11 +252,12 @@ class Assessment(db.Model):
             "stem_total": self.stem_total,
             "abm_total": self.abm_total,
             "humss_total": self.humss_total,
-            "created_at": self.created_at.isoformat(),
+            "created_at": self.created_at,
         }
 
 class Answer(db.Model):
     __tablename__ = "answers"
+    # uq_assessment_question also serves lookups by assessment_id alone
     __table_args__ = (
         UniqueConstraint('assessment_id', 'question_id', name='uq_assessment_question'),
     )
@@ -220,13 +277,16 @@ class Answer(db.Model):
             "assessment_id": self.assessment_id,
             "question_id": self.question_id,
             "answer_value": self.answer_value,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
         }
     
 # -------------------- Results --------------------
 class Results(db.Model):
     __tablename__ = "results"
+    __table_args__ = (
+        db.Index("ix_results_assessment_id", "assessment_id"),
+    )
 
     results_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     stem_score = db.Column(db.Integer, nullable=False)
@@ -241,6 +301,11 @@ class Results(db.Model):
     )
     recommended_strand = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
+    # Packed neighbors, nearest first: Data ids, distances and strand codes
+    # (indexes into knn_engine.STRANDS). NULL when stored as Neighbors rows.
+    neighbor_data_ids = db.Column(ARRAY(db.Integer))
+    neighbor_distances = db.Column(ARRAY(db.Float))
+    neighbor_strands = db.Column(ARRAY(db.SmallInteger))
 
     # Relationships
     neighbors = db.relationship("Neighbors", back_populates="result", cascade="all, delete-orphan")
@@ -256,13 +321,14 @@ class Results(db.Model):
             "tie": self.tie,
             "assessment_id": self.assessment_id,
             "recommended_strand": self.recommended_strand,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "created_at": self.created_at,
         }
 
 
 # -------------------- Neighbors --------------------
 class Neighbors(db.Model):
     __tablename__ = "neighbors"
+    # uq_result_neighbor also serves lookups by results_id alone
     __table_args__ = (
         UniqueConstraint('results_id', 'neighbor_index', name='uq_result_neighbor'),
     )
@@ -284,13 +350,16 @@ class Neighbors(db.Model):
             "neighbor_index": self.neighbor_index,
             "strand": self.strand,
             "distance": self.distance,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "created_at": self.created_at,
         }
 
 
 # -------------------- Tie Table --------------------
 class TieTable(db.Model):
     __tablename__ = "tie_table"
+    __table_args__ = (
+        db.Index("ix_tie_table_results_id", "results_id"),
+    )
 
     tie_table_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
     stem_weight = db.Column(db.Float, nullable=False)
@@ -309,5 +378,5 @@ class TieTable(db.Model):
             "humss_weight": self.humss_weight,
             "abm_weight": self.abm_weight,
             "results_id": self.results_id,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "created_at": self.created_at,
         }
\ No newline at end of file
@@ -1,12 +1,15 @@
 # app/routes/assessment.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app import db
 from app.services.jwt_utils import token_required
 from app.models import (
-    Assessment, Answer, Data, DataSet, Results,
-    Neighbors, TieTable, Question, User
+    Assessment, Answer, DataSet, Results,
+    Neighbors, TieTable, Question
 )
-from app.services.KNN import KNN
+from app.services import model_registry, neighbor_storage, user_cache
+from app.services.question_index import get_question_index
 
 assessment_bp = Blueprint("assessment", __name__)
 
@@ -42,9 +45,69 @@ def calculate_assessment_stats(assessment_id):
         "strand_totals": strand_totals,
         "progress": progress,
         "answered_count": answered_count,
+        "total_questions": total_questions,
+        "question_set_id": dataset.question_set_id,
+    }
+
+STRAND_TOTAL_COLUMNS = {"STEM": "stem_total", "ABM": "abm_total", "HUMSS": "humss_total"}
+
+
+def apply_answer_delta(assessment, question_id, old_value, new_value):
+    """Update strand totals and progress for a single changed answer.
+
+    Only the changed question's strand moves, by the difference between the
+    old and new value, and a first answer bumps the stored answered count, so
+    the whole change is one UPDATE of the assessment row. The caller must
+    hold the row lock (see save_answer) so concurrent saves can't lose each
+    other's deltas. Use calculate_assessment_stats to repair drift.
+    """
+    if assessment.question_set_id is None:
+        # Assessments created before the column was added
+        assessment.question_set_id = (
+            db.session.query(DataSet.question_set_id)
+            .filter(DataSet.data_set_id == assessment.data_set_id)
+            .scalar()
+        )
+    index = get_question_index(assessment.question_set_id)
+    total_questions = index.total
+
+    # Answers outside the dataset's question set don't count, as in the full recompute
+    strand = index.strands.get(int(question_id))
+    if strand is not None:
+        if old_value is None:
+            assessment.answered_count = (assessment.answered_count or 0) + 1
+        column = STRAND_TOTAL_COLUMNS.get(strand)
+        if column:
+            delta = int(new_value) - int(old_value or 0)
+            setattr(assessment, column, (getattr(assessment, column) or 0) + delta)
+
+    answered_count = assessment.answered_count or 0
+    assessment.progress = (answered_count / total_questions) * 100 if total_questions > 0 else 0
+
+    return {
+        "strand_totals": {
+            strand: _as_number(getattr(assessment, column) or 0)
+            for strand, column in STRAND_TOTAL_COLUMNS.items()
+        },
+        "progress": assessment.progress,
+        "answered_count": answered_count,
         "total_questions": total_questions
     }
 
+
+def store_stats(assessment, stats):
+    """Write a full recompute from calculate_assessment_stats onto the assessment."""
+    assessment.question_set_id = stats["question_set_id"]
+    assessment.progress = stats["progress"]
+    assessment.answered_count = stats["answered_count"]
+    assessment.stem_total = stats["strand_totals"]["STEM"]
+    assessment.abm_total = stats["strand_totals"]["ABM"]
+    assessment.humss_total = stats["strand_totals"]["HUMSS"]
+
+
+def _as_number(value):
+    return int(value) if float(value).is_integer() else value
+
 # ---------------- Routes ----------------
 
 # Create assessment
@@ -60,8 +123,7 @@ def create_assessment(payload):
     course_id = data.get("course_id")
     is_first_year = data.get("is_first_year", True)
 
-    user = User.query.get(user_id)
-    if not user:
+    if not user_cache.exists(user_id):
         return jsonify({"error": "User not found"}), 404
 
     new_assessment = Assessment(
@@ -69,6 +131,11 @@ def create_assessment(payload):
         is_first_year=is_first_year,
         course_id=course_id,
         data_set_id=data_set_id,
+        question_set_id=(
+            db.session.query(DataSet.question_set_id)
+            .filter(DataSet.data_set_id == data_set_id)
+            .scalar()
+        ),
         progress=0.0,
         completed=False
     )
@@ -88,13 +155,18 @@ def save_answer(assessment_id):
     if not question_id or answer_value is None:
         return jsonify({"error": "Missing question_id or answer"}), 400
 
-    assessment = Assessment.query.get(assessment_id)
+    # Row lock: concurrent autosaves of one assessment apply their deltas in turn
+    assessment = db.session.get(Assessment, assessment_id, with_for_update=True)
     if not assessment:
         return jsonify({"error": "Assessment not found"}), 404
 
+    # ?verify=1 recomputes everything from the stored answers (repair mode)
+    verify = request.args.get("verify", "").lower() in ("1", "true", "yes")
+
     try:
         # Upsert answer
         existing = Answer.query.filter_by(assessment_id=assessment_id, question_id=question_id).first()
+        old_value = existing.answer_value if existing else None
         if existing:
             existing.answer_value = answer_value
         else:
@@ -105,22 +177,77 @@ def save_answer(assessment_id):
             )
             db.session.add(new_answer)
 
-        db.session.flush()
+        if verify:
+            db.session.flush()
+
+            # Recalculate stats
+            stats = calculate_assessment_stats(assessment_id)
+            store_stats(assessment, stats)
+        else:
+            stats = apply_answer_delta(assessment, question_id, old_value, answer_value)
+
+        db.session.commit()
+
+        return jsonify({
+            "success": True,
+            "progress": stats["progress"],
+            "answered_count": stats["answered_count"],
+            "total_questions": stats["total_questions"],
+            "strand_totals": stats["strand_totals"]
+        })
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
 
-        # Recalculate stats
-        stats = calculate_assessment_stats(assessment_id)
 
-        # Update assessment
-        assessment.progress = stats["progress"]
-        assessment.stem_total = stats["strand_totals"]["STEM"]
-        assessment.abm_total = stats["strand_totals"]["ABM"]
-        assessment.humss_total = stats["strand_totals"]["HUMSS"]
+# Save or update many answers in one statement
+@assessment_bp.route("/assessment/<int:assessment_id>/answers/batch", methods=["PUT"])
+def save_answers_batch(assessment_id):
+    data = request.get_json() or {}
+    items = data.get("answers") if isinstance(data, dict) else data
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Missing answers"}), 400
+
+    # Last value wins for repeated questions; ON CONFLICT can't touch a row twice
+    values = {}
+    for item in items:
+        question_id = item.get("question_id") if isinstance(item, dict) else None
+        answer_value = item.get("answer") if isinstance(item, dict) else None
+        if not question_id or answer_value is None:
+            return jsonify({"error": "Missing question_id or answer"}), 400
+        try:
+            values[int(question_id)] = int(answer_value)
+        except (TypeError, ValueError):
+            return jsonify({"error": "Invalid question_id or answer"}), 400
+
+    # Same row lock as save_answer, so a concurrent autosave's delta isn't overwritten
+    assessment = db.session.get(Assessment, assessment_id, with_for_update=True)
+    if not assessment:
+        return jsonify({"error": "Assessment not found"}), 404
+
+    try:
+        stmt = pg_insert(Answer).values([
+            {"assessment_id": assessment_id, "question_id": q, "answer_value": v}
+            for q, v in values.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_assessment_question",
+            set_={"answer_value": stmt.excluded.answer_value, "updated_at": func.now()},
+        )
+        db.session.execute(stmt)
+
+        # Recalculate stats once for the whole batch
+        stats = calculate_assessment_stats(assessment_id)
+        store_stats(assessment, stats)
 
         db.session.commit()
 
         return jsonify({
             "success": True,
-            "progress": assessment.progress,
+            "saved": len(values),
+            "progress": stats["progress"],
             "answered_count": stats["answered_count"],
             "total_questions": stats["total_questions"],
             "strand_totals": stats["strand_totals"]
@@ -223,18 +350,18 @@ def submit_assessment(assessment_id):
             strand_totals["HUMSS"]
         ]
 
-        # Training data
-        dataset_entries = Data.query.filter_by(data_set_id=assessment.data_set_id).all()
-        if not dataset_entries:
-            return jsonify({"error": "No training data found for dataset"}), 400
-
-        dataset_list = [[d.stem_score, d.abm_score, d.humss_score] for d in dataset_entries]
-        strand_list = [d.strand for d in dataset_entries]
-        print
-
-        # Run KNN
-        knn = KNN(sample_answers, dataset_list, strand_list, assessment.data_set_id)
-        results = knn.start_algorithm()
+        # Precomputed cube first, then the cached, pre-fitted model for this dataset.
+        # The cube holds votes only, so cube-scored results store no neighbors.
+        results = None
+        if current_app.config.get("KNN_LOOKUP_ENABLED"):
+            from app.services import lookup_cube
+            results = lookup_cube.score(assessment.data_set_id, sample_answers)
+        if results is None:
+            try:
+                knn = model_registry.get_model(assessment.data_set_id)
+            except LookupError:
+                return jsonify({"error": "No training data found for dataset"}), 400
+            results = knn.start_algorithm(sample_answers)
 
         # Save Results
         new_result = Results(
@@ -246,18 +373,17 @@ def submit_assessment(assessment_id):
             assessment_id=assessment_id,
             recommended_strand=results["recommendation"],
         )
+        packed = neighbor_storage.packed_enabled()
+        if packed:
+            for column, values in neighbor_storage.pack(results["neighbors"]).items():
+                setattr(new_result, column, values)
         db.session.add(new_result)
         db.session.flush()
 
         # Save neighbors
-        for n in results["neighbors"]:
-            neighbor = Neighbors(
-                results_id=new_result.results_id,
-                neighbor_index=n["neighbor_index"],
-                strand=n["strand"],
-                distance=n["distance"],
-            )
-            db.session.add(neighbor)
+        if not packed:
+            for row in neighbor_storage.neighbor_rows(new_result.results_id, results["neighbors"]):
+                db.session.add(Neighbors(**row))
 
         # Save tie info
         if results["tie"] and results["tie_strands"]:
@@ -272,6 +398,7 @@ def submit_assessment(assessment_id):
         # Mark assessment as completed and sync totals
         assessment.completed = True
         assessment.progress = 100.0
+        assessment.answered_count = stats["answered_count"]
         assessment.stem_total = strand_totals["STEM"]
         assessment.abm_total = strand_totals["ABM"]
         assessment.humss_total = strand_totals["HUMSS"]
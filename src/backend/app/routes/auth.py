@@ -1,25 +1,52 @@
 from flask import Blueprint, request, jsonify
 from ..models import User
-from argon2 import PasswordHasher
 from datetime import datetime, timedelta
+from app.services import mail_queue, passwords, user_cache
+from app.services.http_cache import conditional_json
+from app.services.rate_limit import TokenBucketLimiter
 from app.services.verify_email import verify_email
 from app.services.jwt_utils import generate_jwt, decode_jwt, token_required, create_password_reset_token
 from ..config import Config
 from .. import db
 
 auth_bp = Blueprint("auth", __name__)
-ph = PasswordHasher()
 SECRET_KEY = Config.SECRET_KEY
 ALGORITHM = Config.ALGORITHM
 JWT_EXPIRATION_SECONDS = 3600 
 OTP_EXPIRY = 300      
 RESEND_COOLDOWN = 60  
 
+# Failed password checks per (client IP, email) and per client IP; a success
+# costs nothing, so a whole school logging in from one address isn't throttled.
+# The per-account bucket is keyed by IP too, so failures from elsewhere can't
+# lock the owner out of their account.
+ACCOUNT_LIMIT = TokenBucketLimiter(Config.LOGIN_EMAIL_PER_MINUTE / 60, Config.LOGIN_EMAIL_PER_MINUTE)
+IP_LIMIT = TokenBucketLimiter(Config.LOGIN_IP_PER_MINUTE / 60, Config.LOGIN_IP_PER_MINUTE)
+
+
+def _login_limits(email):
+    ip = request.remote_addr
+    return ((ACCOUNT_LIMIT, (ip, email.lower())), (IP_LIMIT, ip))
+
+
+def _login_throttled(*keys):
+    """429 response if any of the (limiter, key) pairs is out of attempts."""
+    wait = max(limiter.retry_after(key) for limiter, key in keys)
+    if not wait:
+        return None
+    response = jsonify({"success": False, "message": "Too many attempts, please try again later"})
+    response.headers["Retry-After"] = str(int(wait) + 1)
+    return response, 429
+
+
+def _busy():
+    response = jsonify({"success": False, "message": "Server is busy, please try again"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
 
 @auth_bp.route("/login", methods=["POST"])
 def login():
-
-    print("Login endpoint hit")
     data = request.get_json()
     email = data.get("email")
     password = data.get("password")
@@ -27,17 +54,30 @@ def login():
 
     if not email or not password:
         return jsonify({"success": False, "message": "Email and password are required"}), 400
-    print(email, password)
-    
+
+    limits = _login_limits(email)
+    throttled = _login_throttled(*limits)
+    if throttled:
+        return throttled
+
     user = User.query.filter_by(email=email).first()
     
     if user is None:
+        for limiter, key in limits:
+            limiter.consume(key)
         return jsonify({"success": False, "message": "User not found"}), 404
 
     try:
-        ph.verify(user.password, password)
-    except Exception:
+        valid, new_hash = passwords.verify(user.password, password)
+    except passwords.Overloaded:
+        return _busy()
+    if not valid:
+        for limiter, key in limits:
+            limiter.consume(key)
         return jsonify({"success": False, "message": "Invalid credentials"}), 401
+    if new_hash:
+        user.password = new_hash
+        db.session.commit()
 
     token = generate_jwt({"user_id": user.user_id, "email": user.email})
     return jsonify({
@@ -64,12 +104,12 @@ def signup():
     if User.query.filter_by(email=email).first():
         return jsonify({"success": False, "message": "Email already registered"}), 400
 
-    hashed_password = ph.hash(password)
+    hashed_password = passwords.hash_password(password)
     birthday = datetime.strptime(birthday, "%Y-%m-%d").date()
 
-    otp = verify_email(email)
+    otp, delivery_id = verify_email(email)
     if not otp:
-        return jsonify({"success": False, "message": "Error sending verification email"}), 500
+        return jsonify({"success": False, "message": "Error sending verification email"}), 503
 
     # Store user data + OTP in a JWT instead of session
     pending_signup_payload = {
@@ -88,7 +128,9 @@ def signup():
     return jsonify({
         "success": True,
         "message": "OTP sent to email",
-        "signup_token": signup_token
+        "signup_token": signup_token,
+        "delivery_id": delivery_id,
+        "delivery_status": "queued"
     }), 200
 
 @auth_bp.route("/signupcopy", methods=["POST"])
@@ -110,7 +152,7 @@ def signupcopy():
     if User.query.filter_by(email=email).first():
         return jsonify({"success": False, "message": "Email already registered"}), 400
 
-    hashed_password = ph.hash(password)
+    hashed_password = passwords.hash_password(password)
     birthday = datetime.strptime(birthday, "%Y-%m-%d").date()
 
 
@@ -182,9 +224,9 @@ def resend_signup_otp(payload):
     """
     payload: decoded signup JWT passed from @token_required
     """
-    otp = verify_email(payload["email"])
+    otp, delivery_id = verify_email(payload["email"])
     if not otp:
-        return jsonify({"success": False, "message": "Error resending OTP"}), 500
+        return jsonify({"success": False, "message": "Error resending OTP"}), 503
 
     payload["otp"] = otp
     new_signup_token = generate_jwt(payload, expires_in=OTP_EXPIRY)
@@ -192,7 +234,9 @@ def resend_signup_otp(payload):
     return jsonify({
         "success": True,
         "message": "New OTP sent to email",
-        "signup_token": new_signup_token
+        "signup_token": new_signup_token,
+        "delivery_id": delivery_id,
+        "delivery_status": "queued"
     }), 200
 
 @auth_bp.route("/request-otp", methods=["POST"])
@@ -207,9 +251,9 @@ def request_otp():
     if not user:
         return jsonify({"success": False, "message": "User not found"}), 404
 
-    otp = verify_email(email)  # send OTP via email
+    otp, delivery_id = verify_email(email)  # queue OTP email
     if not otp:
-        return jsonify({"success": False, "message": "Error sending OTP email"}), 500
+        return jsonify({"success": False, "message": "Error sending OTP email"}), 503
 
     # create short-lived reset token
     reset_token_payload = {
@@ -221,10 +265,21 @@ def request_otp():
     return jsonify({
         "success": True,
         "message": "OTP sent to email",
-        "reset_token": reset_token
+        "reset_token": reset_token,
+        "delivery_id": delivery_id,
+        "delivery_status": "queued"
     }), 200
 
 
+# Poll an OTP email queued by /signup, /signup/resend-otp or /request-otp
+@auth_bp.route("/otp-delivery/<delivery_id>", methods=["GET"])
+def get_otp_delivery(delivery_id):
+    status = mail_queue.status(delivery_id)
+    if not status:
+        return jsonify({"success": False, "message": "Delivery not found"}), 404
+    return jsonify({"success": True, **status}), 200
+
+
 @auth_bp.route("/forgot-password", methods=["POST"])
 @token_required
 def forgot_password(payload):
@@ -246,7 +301,7 @@ def forgot_password(payload):
     if not user:
         return jsonify({"success": False, "message": "User not found"}), 404
 
-    hashed_password = ph.hash(new_password)
+    hashed_password = passwords.hash_password(new_password)
     user.password = hashed_password
     db.session.commit()
 
@@ -260,20 +315,30 @@ def verify_password(payload):
 
     if not password:
         return jsonify({"valid": False, "message": "Password is required"}), 400
+    limits = _login_limits(str(payload.get("email", "")))
+    throttled = _login_throttled(*limits)
+    if throttled:
+        return throttled
     user = User.query.get(payload["user_id"])
     if not user:
         return jsonify({"valid": False, "message": "User not found"}), 404
     try:
-        ph.verify(user.password, password)
-        return jsonify({"valid": True}), 200
-    except Exception:
+        valid, new_hash = passwords.verify(user.password, password)
+    except passwords.Overloaded:
+        return _busy()
+    if not valid:
+        for limiter, key in limits:
+            limiter.consume(key)
         return jsonify({"valid": False, "message": "Your current password is wrong"}), 401
+    if new_hash:
+        user.password = new_hash
+        db.session.commit()
+    return jsonify({"valid": True}), 200
 
 @auth_bp.route("/me", methods=["GET"])
 @token_required
 def get_current_user(payload):
-    user_id = payload.get("user_id")
-    user = User.query.get(user_id)
-    if not user:
+    cached = user_cache.profile(payload.get("user_id"))
+    if not cached:
         return jsonify({"error": "User not found"}), 404
-    return jsonify(user.user_info()), 200
\ No newline at end of file
+    return conditional_json(cached, cache_control="private, no-cache")
\ No newline at end of file
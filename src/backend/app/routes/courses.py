@@ -2,14 +2,19 @@ from flask import Blueprint, request, jsonify
 from app import db
 from app.models import Course
 from sqlalchemy.exc import SQLAlchemyError
+from app.services import cache_bus, reference_cache
+from app.services.http_cache import conditional_json
 
 courses_bp = Blueprint("courses", __name__)
 
 # Get all courses
 @courses_bp.route("/courses", methods=["GET"])
 def get_courses():
-    courses = Course.query.all()
-    return jsonify([c.course_info() for c in courses]), 200
+    def build():
+        courses = Course.query.all()
+        return [c.course_info() for c in courses], None
+
+    return conditional_json(reference_cache.cached(reference_cache.COURSES, build))
 
 # Add a new course
 @courses_bp.route("/courses", methods=["POST"])
@@ -18,6 +23,7 @@ def create_course():
         data = request.get_json()
         new_course = Course(course_name=data["course_name"])
         db.session.add(new_course)
+        cache_bus.publish("courses")
         db.session.commit()
         return jsonify(new_course.course_info()), 201
     except SQLAlchemyError as e:
@@ -30,6 +36,7 @@ def delete_course(course_id):
     course = Course.query.get_or_404(course_id)
     try:
         db.session.delete(course)
+        cache_bus.publish("courses")
         db.session.commit()
         return jsonify({"message": f"Course {course_id} deleted"}), 200
     except SQLAlchemyError as e:
@@ -1,8 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from app import db
+from app.services import cache_bus, jobs, reference_cache
+from app.services.http_cache import conditional_json
+from app.services.jwt_utils import admin_required
 from app.models import DataSet, Data, Question, QuestionSet
+from sqlalchemy import func, select
 from sqlalchemy.exc import SQLAlchemyError
-import pandas as pd
+import csv
+import io
 
 dataset_bp = Blueprint("datasets", __name__)
 
@@ -11,17 +16,17 @@ dataset_bp = Blueprint("datasets", __name__)
 @dataset_bp.route("/datasets", methods=["GET"])
 def get_datasets():
     try:
-        datasets = DataSet.query.all()
-        response = []
-        for ds in datasets:
-            print("Loaded dataset:", ds)  # debug
-            rows_count = Data.query.filter_by(data_set_id=ds.data_set_id).count()
-            print("Rows count:", rows_count)
-            print("DataSet info:", ds.data_set_info())  # <- likely crashes here
-            response.append({
-                **ds.data_set_info(),
-                "rows": rows_count
-            })
+        rows_count = (
+            db.session.query(Data.data_set_id, func.count(Data.data_id).label("rows"))
+            .group_by(Data.data_set_id)
+            .subquery()
+        )
+        datasets = (
+            db.session.query(DataSet, func.coalesce(rows_count.c.rows, 0))
+            .outerjoin(rows_count, rows_count.c.data_set_id == DataSet.data_set_id)
+            .all()
+        )
+        response = [{**ds.data_set_info(), "rows": rows} for ds, rows in datasets]
         return jsonify(response), 200
     except Exception as e:  # catch everything
         print("❌ ERROR in /datasets:", str(e))
@@ -31,23 +36,210 @@ def get_datasets():
 #Get question set though dataset
 @dataset_bp.route("/active-dataset", methods=["GET"])
 def get_active_dataset():
-    active_set = DataSet.query.filter_by(status="Active").first()
-    if not active_set:
+    def build():
+        active_set = DataSet.query.filter_by(status="Active").first()
+        if not active_set:
+            return None
+
+        # include question_set info directly (optional, but handy for client)
+        return {
+            **active_set.data_set_info(),
+            "question_set": {
+                "question_set_id": active_set.question_set.question_set_id,
+                "question_set_name": active_set.question_set.question_set_name,
+            }
+        }, None  # ETag only: the question set is renamed without touching the dataset
+
+    cached = reference_cache.cached(reference_cache.ACTIVE_DATASET, build)
+    if cached is None:
         return jsonify({"error": "No active dataset found"}), 404
+    return conditional_json(cached)
+RECORD_COLUMNS = (Data.data_id, Data.data_set_id, Data.stem_score, Data.abm_score, Data.humss_score, Data.strand)
+RECORDS_PAGE_SIZE = 1000
+RECORDS_MAX_PAGE_SIZE = 10000
+RECORDS_STREAM_BATCH = 5000
 
-    # include question_set info directly (optional, but handy for client)
-    return jsonify({
-        **active_set.data_set_info(),
-        "question_set": {
-            "question_set_id": active_set.question_set.question_set_id,
-            "question_set_name": active_set.question_set.question_set_name,
-        }
-    }), 200
+
+# Get dataset records: keyset-paginated JSON, or a streamed CSV/NDJSON export
 @dataset_bp.route("/datasets/<int:data_set_id>/records", methods=["GET"])
 def get_dataset_records(data_set_id):
+    export_format = request.args.get("format", "json").lower()
+    if export_format in ("csv", "ndjson"):
+        return _stream_dataset_records(data_set_id, export_format)
+    if export_format != "json":
+        return jsonify({"error": f"Unsupported format: {export_format}"}), 400
+
+    after = request.args.get("after", 0, type=int)
+    limit = max(1, min(request.args.get("limit", RECORDS_PAGE_SIZE, type=int), RECORDS_MAX_PAGE_SIZE))
     try:
-        records = Data.query.filter_by(data_set_id=data_set_id).all()
-        return jsonify([r.data_info() for r in records]), 200
+        rows = (
+            db.session.query(*RECORD_COLUMNS)
+            .filter(Data.data_set_id == data_set_id, Data.data_id > after)
+            .order_by(Data.data_id)
+            .limit(limit)
+            .all()
+        )
     except SQLAlchemyError as e:
         return jsonify({"error": str(e)}), 500
-    
+
+    response = jsonify([r._asdict() for r in rows])
+    # A full page means there may be more; the client passes ?after=<cursor>
+    if len(rows) == limit:
+        next_cursor = rows[-1].data_id
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+        response.headers["Link"] = (
+            f'<{request.base_url}?after={next_cursor}&limit={limit}>; rel="next"'
+        )
+    return response, 200
+
+
+def _stream_dataset_records(data_set_id, export_format):
+    query = (
+        select(*RECORD_COLUMNS)
+        .where(Data.data_set_id == data_set_id)
+        .order_by(Data.data_id)
+    )
+    keys = [c.key for c in RECORD_COLUMNS]
+
+    def generate():
+        # Server-side cursor: rows arrive in batches, never as ORM objects
+        with db.engine.connect() as conn:
+            result = conn.execution_options(yield_per=RECORDS_STREAM_BATCH).execute(query)
+            if export_format == "csv":
+                yield ",".join(keys) + "\n"
+            for rows in result.partitions():
+                buffer = io.StringIO()
+                if export_format == "csv":
+                    csv.writer(buffer, lineterminator="\n").writerows(rows)
+                else:
+                    dumps = current_app.json.dumps
+                    for row in rows:
+                        buffer.write(dumps(dict(zip(keys, row))))
+                        buffer.write("\n")
+                yield buffer.getvalue()
+
+    mimetype = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    filename = f"dataset-{data_set_id}-records.{export_format}"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+# Make a dataset the active one; optionally precompute its lookup cube
+@dataset_bp.route("/datasets/<int:data_set_id>/activate", methods=["PUT"])
+@admin_required
+def activate_dataset(payload, data_set_id):
+    dataset = DataSet.query.get_or_404(data_set_id)
+    try:
+        previously_active = [
+            ds_id for (ds_id,) in db.session.query(DataSet.data_set_id).filter(
+                DataSet.status == "Active", DataSet.data_set_id != data_set_id
+            )
+        ]
+        DataSet.query.filter(DataSet.data_set_id.in_(previously_active)).update(
+            {"status": "Inactive"}, synchronize_session=False
+        )
+        dataset.status = "Active"
+        for ds_id in (*previously_active, data_set_id):
+            cache_bus.publish("dataset", ds_id)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+
+    response = dataset.data_set_info()
+    if current_app.config.get("KNN_LOOKUP_ENABLED"):
+        from app.services.lookup_cube import build_lookup
+
+        response["lookup_job_id"] = jobs.submit(
+            current_app._get_current_object(), "lookup", build_lookup, data_set_id,
+            max_cells=current_app.config.get("KNN_LOOKUP_MAX_CELLS"),
+        )
+    return jsonify(response), 200
+
+
+# Import a dataset from an uploaded CSV/Parquet file, then select its k
+@dataset_bp.route("/datasets/import", methods=["POST"])
+@admin_required
+def import_dataset(payload):
+    import psycopg2
+    from app.services.dataset_import import import_dataset as run_import
+    from app.services.k_selection import select_best_k
+
+    upload = request.files.get("file")
+    data_set_name = request.form.get("data_set_name")
+    question_set_id = request.form.get("question_set_id", type=int)
+    if not upload or not data_set_name or not question_set_id:
+        return jsonify({"error": "file, data_set_name and question_set_id are required"}), 400
+
+    file_format = request.form.get("format")
+    if not file_format:
+        file_format = "parquet" if (upload.filename or "").lower().endswith(".parquet") else "csv"
+
+    try:
+        result = run_import(
+            upload.stream, data_set_name, question_set_id,
+            description=request.form.get("data_set_description"),
+            file_format=file_format,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except (SQLAlchemyError, psycopg2.Error) as e:
+        # COPY runs on the raw cursor, so bad values surface as psycopg2 errors
+        db.session.rollback()
+        return jsonify({"error": str(e).strip()}), 400
+
+    job_id = jobs.submit(
+        current_app._get_current_object(), "train", select_best_k, result["data_set_id"],
+    )
+    return jsonify({**result, "train_job_id": job_id}), 201
+
+
+# Re-score every completed assessment of a dataset in the background
+@dataset_bp.route("/datasets/<int:data_set_id>/rescore", methods=["POST"])
+@admin_required
+def rescore_dataset(payload, data_set_id):
+    from app.services.rescoring import rescore_dataset as run_rescore, DEFAULT_CHUNK_SIZE
+
+    DataSet.query.get_or_404(data_set_id)
+    data = request.get_json(silent=True) or {}
+    chunk_size = int(data.get("chunk_size", DEFAULT_CHUNK_SIZE))
+
+    job_id = jobs.submit(
+        current_app._get_current_object(), "rescore", run_rescore,
+        data_set_id, chunk_size=chunk_size,
+    )
+    return jsonify({"job_id": job_id, "status": "queued"}), 202
+
+
+# Select best_k and accuracy by cross-validation in the background
+@dataset_bp.route("/datasets/<int:data_set_id>/train", methods=["POST"])
+@admin_required
+def train_dataset(payload, data_set_id):
+    from app.services.k_selection import select_best_k
+
+    DataSet.query.get_or_404(data_set_id)
+    data = request.get_json(silent=True) or {}
+    options = {}
+    if "k_min" in data or "k_max" in data:
+        options["k_values"] = range(int(data.get("k_min", 1)), int(data.get("k_max", 30)) + 1)
+    if "folds" in data:
+        options["folds"] = int(data["folds"])
+
+    job_id = jobs.submit(
+        current_app._get_current_object(), "train", select_best_k,
+        data_set_id, **options,
+    )
+    return jsonify({"job_id": job_id, "status": "queued"}), 202
+
+
+# Poll a background dataset job
+@dataset_bp.route("/datasets/jobs/<job_id>", methods=["GET"])
+@admin_required
+def get_dataset_job(payload, job_id):
+    job = jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job), 200
@@ -0,0 +1,10 @@
+from flask import Blueprint, Response
+from app.services import metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+# Prometheus scrape endpoint for this worker process
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
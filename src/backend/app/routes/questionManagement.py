@@ -1,24 +1,48 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, abort
 from app import db
-from app.models import QuestionSet, Question
+from app.models import QuestionSet, Question, DataSet, Assessment
+from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
+from app.services import cache_bus, reference_cache
+from app.services.http_cache import conditional_json
 
 question_sets_bp = Blueprint("question-sets", __name__)
 
 # Get all question sets
 @question_sets_bp.route("/question-sets", methods=["GET"])
 def get_question_sets():
-    sets = QuestionSet.query.all()
+    question_counts = (
+        db.session.query(Question.set_id, func.count(Question.question_id).label("total"))
+        .group_by(Question.set_id)
+        .subquery()
+    )
+    response_counts = (
+        db.session.query(DataSet.question_set_id, func.count(Assessment.assessment_id).label("total"))
+        .join(Assessment, Assessment.data_set_id == DataSet.data_set_id)
+        .filter(Assessment.completed.is_(True))
+        .group_by(DataSet.question_set_id)
+        .subquery()
+    )
+    sets = (
+        db.session.query(
+            QuestionSet,
+            func.coalesce(question_counts.c.total, 0),
+            func.coalesce(response_counts.c.total, 0),
+        )
+        .outerjoin(question_counts, question_counts.c.set_id == QuestionSet.question_set_id)
+        .outerjoin(response_counts, response_counts.c.question_set_id == QuestionSet.question_set_id)
+        .all()
+    )
     response = []
-    for s in sets:
+    for s, total_questions, responses in sets:
         response.append({
             "question_set_id": s.question_set_id,
             "question_set_name": s.question_set_name,
         
-            "total_questions": len(Question.query.filter_by(set_id=s.question_set_id).all()),
-            "responses": 0,   
+            "total_questions": total_questions,
+            "responses": responses,
             "description": s.description,  # optional field
-            "created_at": s.created_at.isoformat()
+            "created_at": s.created_at
         })
     return jsonify(response), 200
 
@@ -26,19 +50,27 @@ def get_question_sets():
 # Get a specific question set (with all questions)
 @question_sets_bp.route("/question-sets/<int:set_id>", methods=["GET"])
 def get_question_set(set_id):
-    s = QuestionSet.query.get_or_404(set_id)
-    return jsonify({
-        "question_set_id": s.question_set_id,
-        "question_set_name": s.question_set_name,
+    def build():
+        s = db.session.get(QuestionSet, set_id)
+        if not s:
+            return None
+        # Plain column rows; no Question objects to build and discard
+        questions = (
+            db.session.query(Question.question_id, Question.question_text, Question.strand)
+            .filter(Question.set_id == set_id)
+            .all()
+        )
+        return {
+            "question_set_id": s.question_set_id,
+            "question_set_name": s.question_set_name,
+
+            "questions": [q._asdict() for q in questions]
+        }, s.last_updated
 
-        "questions": [
-            {
-                "question_id": q.question_id,
-                "question_text": q.question_text,
-                "strand": q.strand
-            } for q in s.questions
-        ]
-    })
+    cached = reference_cache.cached(reference_cache.question_set_key(set_id), build)
+    if cached is None:
+        abort(404)
+    return conditional_json(cached)
 
 
 # Add new question set
@@ -65,6 +97,7 @@ def create_question_set():
             )
             db.session.add(new_question)
 
+        cache_bus.publish("question_set", new_set.question_set_id)
         db.session.commit()
 
         return jsonify(new_set.question_set_info()), 201
@@ -81,6 +114,7 @@ def update_question_set(set_id):
         data = request.get_json()
         s.question_set_name = data.get("question_set_name", s.question_set_name)
         s.description = data.get("description", s.description)
+        cache_bus.publish("question_set", set_id)
         db.session.commit()
         return jsonify(s.question_set_info()), 200
     except SQLAlchemyError as e:
@@ -95,18 +129,23 @@ def update_question_set(set_id):
 
 @question_sets_bp.route("/question-sets/<int:set_id>/questions", methods=["GET"])
 def get_questions_for_set(set_id):
-    questions = Question.query.filter_by(set_id=set_id).all()
-    return jsonify([{
-        "question_id": q.question_id,
-        "question_text": q.question_text,
-        "strand": q.strand
-    } for q in questions])
+    def build():
+        questions = (
+            db.session.query(Question.question_id, Question.question_text, Question.strand)
+            .filter(Question.set_id == set_id)
+            .all()
+        )
+        last_updated = db.session.query(QuestionSet.last_updated).filter_by(question_set_id=set_id).scalar()
+        return [q._asdict() for q in questions], last_updated
+
+    return conditional_json(reference_cache.cached(reference_cache.questions_key(set_id), build))
 
 @question_sets_bp.route("/question-sets/<int:set_id>", methods=["DELETE"])
 def delete_question_set(set_id):
     s = QuestionSet.query.get_or_404(set_id)
     try:
         db.session.delete(s)
+        cache_bus.publish("question_set", set_id)
         db.session.commit()
         return jsonify({"message": f"Question set {set_id} deleted"}), 200
     except SQLAlchemyError as e:
@@ -1,75 +1,78 @@
 # app/routes/results.py
 from flask import Blueprint, jsonify
+from sqlalchemy.orm import contains_eager, joinedload
 from app import db
-from app.models import Results, Neighbors, Assessment, DataSet
+from app.models import Results, Assessment, DataSet
+from app.services import result_cache
+from app.services.http_cache import conditional_json
+from app.services.neighbor_storage import stored_neighbors
 
 results_bp = Blueprint("results", __name__)
 
-# ----- GET Assessment Results -----
-@results_bp.route("/results/<int:assessment_id>", methods=["GET"])
-def get_results(assessment_id):
-    # Check if assessment exists
-    assessment = Assessment.query.get(assessment_id)
-    if not assessment:
-        return jsonify({"error": "Assessment not found"}), 404
 
-    if not assessment.completed:
-        return jsonify({"error": "Results are locked until the assessment is completed"}), 403
+def cached_results(assessment_id):
+    """The cached payload for an assessment, loading it in one query on a miss.
+
+    Returns ``(entry, None)`` or ``(None, error response)``.
+    """
+    entry = result_cache.get(assessment_id)
+    if entry is not None:
+        return entry, None
 
-    # Fetch results
-    # inside get_results
-    result = Results.query.filter_by(assessment_id=assessment.assessment_id).first()
-    if not result:
-        return jsonify({"error": "Results not found"}), 404
+    # Results, assessment, dataset name and tie weights in one round trip
+    row = (
+        db.session.query(Results, DataSet.data_set_name)
+        .join(Results.assessment)
+        .outerjoin(DataSet, DataSet.data_set_id == Assessment.data_set_id)
+        .options(contains_eager(Results.assessment), joinedload(Results.tie_table))
+        .filter(Results.assessment_id == assessment_id)
+        .first()
+    )
+    assessment = row[0].assessment if row else Assessment.query.get(assessment_id)
+    if not assessment:
+        return None, (jsonify({"error": "Assessment not found"}), 404)
+    if not assessment.completed:
+        return None, (jsonify({"error": "Results are locked until the assessment is completed"}), 403)
+    if row is None:
+        return None, (jsonify({"error": "Results not found"}), 404)
 
-    # fetch dataset
-    dataset = DataSet.query.get(assessment.data_set_id)
+    result, dataset_name = row
 
-    return jsonify({
+    neighbors = stored_neighbors(result)
+    payload = {
         "results_id": result.results_id,
         "recommended_strand": result.recommended_strand,
         "stem_score": result.stem_score,
         "humss_score": result.humss_score,
         "abm_score": result.abm_score,
         "recommendation_description": result.recommendation_description,  # <- include description too
-        "dataset_name": dataset.data_set_name if dataset else None,
-        "created_at": result.created_at.isoformat() if result.created_at else None,  # ✅ added
-        "neighbors": [
-            {
-                "neighbor_index": n.neighbor_index,
-                "strand": n.strand,
-                "distance": float(n.distance) if n.distance else None
-            } for n in result.neighbors
-        ],
+        "dataset_name": dataset_name,
+        "created_at": result.created_at,  # ✅ added
+        "neighbors": neighbors,
         "tie_info": {
             "stem_weight": result.tie_table.stem_weight,
             "humss_weight": result.tie_table.humss_weight,
             "abm_weight": result.tie_table.abm_weight
         } if result.tie_table else None
-    }), 200
+    }
+    return result_cache.put(assessment_id, result.results_id, payload, neighbors), None
+
+
+# ----- GET Assessment Results -----
+@results_bp.route("/results/<int:assessment_id>", methods=["GET"])
+def get_results(assessment_id):
+    # Served from the cache (or a 304) once the results have been read
+    entry, error = cached_results(assessment_id)
+    if error:
+        return error
+    return conditional_json(entry.payload)
 
 
 # ----- GET Neighbors for Assessment -----
 @results_bp.route("/results/<int:assessment_id>/neighbors", methods=["GET"])
 def get_neighbors(assessment_id):
-    # Find results entry first
-    result = Results.query.filter_by(assessment_id=assessment_id).first()
-    if not result:
-        return jsonify({"error": "Results not found"}), 404
-
-    # Fetch neighbors
-    neighbors = Neighbors.query.filter_by(results_id=result.results_id).all()
-    if not neighbors:
-        return jsonify([]), 200  # empty list
-
-    neighbors_data = [
-        {
-            "neighbors_id": n.neighbors_id,
-            "neighbor_index": n.neighbor_index,
-            "strand": n.strand,
-            "distance": float(n.distance) if n.distance else None,
-        }
-        for n in neighbors
-    ]
-
-    return jsonify(neighbors_data), 200
+    # Packed arrays or legacy Neighbors rows; empty for lookup-cube results
+    entry, error = cached_results(assessment_id)
+    if error:
+        return error
+    return conditional_json(entry.neighbors)
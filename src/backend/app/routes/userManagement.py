@@ -1,7 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from ..models import User
 from app import db
-from app.services.jwt_utils import token_required
+from app.services import jobs, user_cache
+from app.services.http_cache import conditional_json
+from app.services.jwt_utils import admin_required, token_required
+import io
 
 userManagement_bp = Blueprint("user-management", __name__)
 
@@ -15,11 +18,11 @@ def get_profile(payload):
         if not user_id:
             return jsonify({"error": "Unauthorized"}), 401
 
-        user = User.query.get(user_id)
-        if not user:
+        cached = user_cache.profile(user_id)
+        if not cached:
             return jsonify({"error": "User not found"}), 404
 
-        return jsonify(user.user_info()), 200
+        return conditional_json(cached, cache_control="private, no-cache")
     except Exception as e:
         return jsonify({"error": f"Failed to fetch profile: {str(e)}"}), 500
 
@@ -51,3 +54,29 @@ def update_profile(payload):
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Failed to update profile: {str(e)}"}), 500
+
+
+# Create accounts for a whole class from a roster CSV in the background
+@userManagement_bp.route("/users/import", methods=["POST"])
+@admin_required
+def import_users(payload):
+    from app.services.roster_import import import_roster
+
+    upload = request.files.get("file")
+    if not upload:
+        return jsonify({"error": "file is required"}), 400
+
+    # The upload stream closes with the request, so hand the job a copy
+    source = io.BytesIO(upload.read())
+    job_id = jobs.submit(current_app._get_current_object(), "roster", import_roster, source)
+    return jsonify({"job_id": job_id, "status": "queued"}), 202
+
+
+# Poll a roster import; its result lists created accounts and per-row errors
+@userManagement_bp.route("/users/jobs/<job_id>", methods=["GET"])
+@admin_required
+def get_user_job(payload, job_id):
+    job = jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job), 200
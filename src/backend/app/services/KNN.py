@@ -1,121 +1,93 @@
-from sklearn.neighbors import KNeighborsClassifier
-from app.models import DataSet, Question
+import time
 import numpy as np
+from app.services import knn_engine, metrics
+from app.services.knn_engine import STRANDS, SCORE_KEYS, WEIGHT_KEYS, UNKNOWN_STRAND
+from app.services.training_matrix import DEDUP_RATIO
 
-class KNN:
-    def __init__(self, sample_answers, dataset_list, strand_list, dataset_id):
-        self.sample_answers = np.array(sample_answers).reshape(1, -1)
-        self.dataset_list = dataset_list
-        self.strand_list = strand_list
-        self.dataset_id = dataset_id
-
-    def start_algorithm(self):
-        dataset = DataSet.query.get(self.dataset_id)
-        if not dataset:
-            raise ValueError(f"Dataset with id {self.dataset_id} not found.")
-
-        k = dataset.best_k
-        knn = KNeighborsClassifier(n_neighbors=k)
-        knn.fit(self.dataset_list, self.strand_list)
-
-        
-        results = self.predict(knn, k, self.sample_answers)
-        return results
-
-    def calculate_distance(self, knn, sample_vector):
-        distances, indices = knn.kneighbors(sample_vector)
-        return indices[0], distances[0]
-
-    def predict(self, knn, k, sample_vector):
-        indices, distances = self.calculate_distance(knn, sample_vector)
+QUERY_SECONDS = metrics.histogram(
+    "knn_query_seconds", "Nearest-neighbor search time per call.", labelnames=("data_set_id", "kind"),
+)
 
-        total_stem, total_humss, total_abm = 0, 0, 0
-        neighbors = []
-        print("Nearest Neighbors:")
-        print("Index\tStrand\tDistance")
-        print("-------------------------")
-        print(f"Sample Vector: {sample_vector.flatten().tolist()}")
-        print("-------------------------")
-        print(f"K: {k}")
-        for i, idx in enumerate(indices):
-            strand = self.strand_list[idx]
-            dist = float(distances[i])
-
-            neighbors.append({
-                "neighbor_index": int(idx + 1),
-                "strand": strand,
-                "distance": dist,
-            })
-
-            if strand == "STEM":
-                total_stem += 1
-            elif strand == "HUMSS":
-                total_humss += 1
-            elif strand == "ABM":
-                total_abm += 1
-            else:
-                print(f"⚠️ Unexpected strand at index {idx}: {strand}")
-            
-        strand_votes = {
-            "stem_score": total_stem,
-            "humss_score": total_humss,
-            "abm_score": total_abm,
-            "neighbors": neighbors,
-            "k": k,
-        }
-
-        vote_score = [total_stem, total_humss, total_abm]
-
-        if vote_score.count(max(vote_score)) > 1:
-            strand_votes["tie"] = True
-            strand_votes["tie_strands"] = {}
-            recommendation = self.tie_breaker(
-                strand_votes, [n["strand"] for n in neighbors],
-                [n["distance"] for n in neighbors],
-                max(vote_score)
+class KNN:
+    def __init__(self, matrix, k, points=None, data_set_id=None):
+        """``matrix`` is a TrainingMatrix; ``points`` its DedupedPoints, if already built."""
+        self.matrix = matrix
+        self.k = k
+        self.data_set_id = data_set_id
+        # Survey data sits on a small lattice; search distinct points when
+        # that shrinks the index enough to pay off.
+        if points is None and len(matrix):
+            points = matrix.deduplicate()
+            if len(points) > DEDUP_RATIO * len(matrix):
+                points = None
+        self.points = points
+
+    def kneighbors(self, samples):
+        started = time.perf_counter()
+        if self.points is not None:
+            found = knn_engine.kneighbors_deduped(
+                self.points.points, self.points.offsets, self.points.members, samples, self.k
             )
+        else:
+            found = knn_engine.kneighbors(self.matrix.features, samples, self.k)
+        QUERY_SECONDS.observe(
+            time.perf_counter() - started,
+            data_set_id=self.data_set_id, kind="single" if len(samples) == 1 else "batch",
+        )
+        return found
+
+    def start_algorithm(self, sample_answers):
+        sample_vector = np.array(sample_answers).reshape(1, -1)
+        return self.predict(self.k, sample_vector)
+
+    def predict_batch(self, samples):
+        """Score an (N, 3) matrix of strand totals in one pass."""
+        indices, distances = self.kneighbors(samples)
+        return knn_engine.score_neighbors(indices, distances, self.matrix.codes)
+
+    def neighbors(self, sample_answers):
+        """Nearest neighbors of one sample, without voting."""
+        indices, distances = self.kneighbors([sample_answers])
+        return self.neighbor_list(indices[0], distances[0])
+
+    def neighbor_list(self, indices, distances):
+        """Neighbor dicts: ``neighbor_index`` is the 1-based rank, ``data_id`` the Data row."""
+        return [
+            {
+                "neighbor_index": rank,
+                "data_id": int(self.matrix.data_ids[idx]),
+                "strand": self.matrix.strand(idx),
+                "distance": float(dist),
+            }
+            for rank, (idx, dist) in enumerate(zip(indices, distances), start=1)
+        ]
+
+    def predict(self, k, sample_vector):
+        batch = self.predict_batch(sample_vector)
+        for idx, code in zip(batch.indices[0], batch.codes[0]):
+            if code >= UNKNOWN_STRAND:
+                print(f"⚠️ Unexpected strand at index {idx}: {self.matrix.strand(idx)}")
+
+        return self.result_at(batch, 0)
+
+    def result_at(self, batch, row):
+        """Build the per-sample result dict for one row of a batch."""
+        neighbors = self.neighbor_list(batch.indices[row], batch.distances[row])
+
+        strand_votes = {key: int(v) for key, v in zip(SCORE_KEYS, batch.votes[row])}
+        strand_votes["neighbors"] = neighbors
+        strand_votes["k"] = self.k
+
+        if batch.tie[row]:
+            strand_votes["tie"] = True
+            strand_votes["tie_strands"] = {
+                key: float(w)
+                for key, w, is_tied in zip(WEIGHT_KEYS, batch.tie_weights[row], batch.tied[row])
+                if is_tied
+            }
         else:
             strand_votes["tie"] = False
             strand_votes["tie_strands"] = None
-            recommendation = max(
-                ["stem_score", "humss_score", "abm_score"], key=strand_votes.get
-            )
 
-        strand_votes["recommendation"] = self.fix_recommendation(recommendation)
+        strand_votes["recommendation"] = STRANDS[batch.recommendation[row]]
         return strand_votes
-
-
-    def tie_breaker(self, strand_votes, nearest_neighbors, distances, tie_score):
-        tied_strands = {}
-        for key, value in strand_votes.items():
-            if value == tie_score and key in ["stem_score", "humss_score", "abm_score"]:
-                tied_strands[key.replace("score", "weight")] = 0
-
-        for i, strand in enumerate(nearest_neighbors):
-            weight = float(1 / distances[i]) if distances[i] != 0 else 1.0
-            if strand == "STEM" and "stem_weight" in tied_strands:
-                tied_strands["stem_weight"] += weight
-            elif strand == "HUMSS" and "humss_weight" in tied_strands:
-                tied_strands["humss_weight"] += weight
-            elif strand == "ABM" and "abm_weight" in tied_strands:
-                tied_strands["abm_weight"] += weight
-
-        recommendation = max(tied_strands, key=tied_strands.get)
-        if recommendation == "stem_weight":
-            recommendation = "stem_score"
-        elif recommendation == "humss_weight":
-            recommendation = "humss_score"
-        elif recommendation == "abm_weight":
-            recommendation = "abm_score"
-
-        strand_votes["tie"] = True
-        strand_votes["tie_strands"] = tied_strands
-        return recommendation
-
-    def fix_recommendation(self, recommendation):
-        if recommendation in ["stem_weight", "stem_score"]:
-            return "STEM"
-        elif recommendation in ["humss_weight", "humss_score"]:
-            return "HUMSS"
-        elif recommendation in ["abm_weight", "abm_score"]:
-            return "ABM"
\ No newline at end of file
@@ -0,0 +1,108 @@
+# app/services/cache.py
+"""Small thread-safe in-process caches."""
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key, value):
+        # Caller holds self._lock
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TTLCache(LRUCache):
+    """LRUCache whose entries also expire ``ttl`` seconds after being set."""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self._building = {}  # key -> [lock, callers using it]
+        # Bumped by every eviction so a build that raced one isn't stored
+        self._generation = 0
+
+    def get(self, key, default=None):
+        entry = super().get(key)
+        if entry is None:
+            return default
+        deadline, value = entry
+        if deadline < time.monotonic():
+            super().pop(key)
+            return default
+        return value
+
+    def set(self, key, value):
+        super().set(key, (time.monotonic() + self.ttl, value))
+
+    def pop(self, key, default=None):
+        with self._lock:
+            self._generation += 1
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def get_or_build(self, key, build):
+        """Return the cached value, calling ``build()`` at most once per key at
+        a time so a burst of misses doesn't all reach the database. ``None``
+        results aren't cached."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        # The key's lock stays registered until its last waiter is done, so a
+        # late caller queues behind the build instead of starting another.
+        with self._lock:
+            building = self._building.setdefault(key, [threading.Lock(), 0])
+            building[1] += 1
+        try:
+            with building[0]:
+                value = self.get(key)
+                if value is None:
+                    with self._lock:
+                        generation = self._generation
+                    value = build()
+                    with self._lock:
+                        if value is not None and generation == self._generation:
+                            self._store(key, (time.monotonic() + self.ttl, value))
+        finally:
+            with self._lock:
+                building[1] -= 1
+                if not building[1]:
+                    del self._building[key]
+        return value
@@ -0,0 +1,131 @@
+# app/services/cache_bus.py
+"""Cross-node cache invalidation over PostgreSQL LISTEN/NOTIFY.
+
+Write paths call ``publish(kind, key)`` inside their transaction. The NOTIFY
+is delivered to every node only if the transaction commits; the publishing
+node evicts its own caches right after the commit. Caches register with
+``subscribe(kind, handler)``, where ``handler(key)`` gets ``None`` to mean
+"drop everything" (sent after the listener reconnects and may have missed
+messages).
+"""
+import json
+import os
+import select
+import threading
+import time
+import uuid
+from collections import defaultdict
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app import db
+
+CHANNEL = "pathfinder_cache"
+POLL_SECONDS = 5
+MAX_BACKOFF_SECONDS = 60
+
+NODE_ID = uuid.uuid4().hex
+_handlers = defaultdict(list)
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def subscribe(kind, handler):
+    if handler not in _handlers[kind]:
+        _handlers[kind].append(handler)
+
+
+def publish(kind, key=None, session=None):
+    """Queue an eviction of ``kind``/``key`` on every node once the session commits.
+
+    Pass ``session`` when calling from a session event hook.
+    """
+    session = session or db.session()
+    events = session.info.setdefault("cache_events", [])
+    if (kind, key) in events:
+        return
+    events.append((kind, key))
+    connection = session.connection()
+    if connection.dialect.name == "postgresql":
+        payload = json.dumps({"node": NODE_ID, "kind": kind, "key": key})
+        connection.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+
+
+def dispatch(kind, key=None):
+    for handler in list(_handlers.get(kind, ())):
+        try:
+            handler(key)
+        except Exception as e:
+            print(f"⚠️ Cache handler for {kind} failed:", e)
+
+
+def dispatch_all():
+    for kind in list(_handlers):
+        dispatch(kind, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_local(session):
+    for kind, key in session.info.pop("cache_events", ()):
+        dispatch(kind, key)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_local(session, previous_transaction):
+    session.info.pop("cache_events", None)
+
+
+# ---------------- Listener ----------------
+def start_listener(app):
+    """Start the LISTEN thread once per process (after any fork)."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None and _listener[0] == os.getpid():
+            return
+        with app.app_context():
+            url = db.engine.url
+        if url.get_backend_name() != "postgresql":
+            return
+        dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        thread = threading.Thread(target=_listen, args=(dsn,), name="cache-bus", daemon=True)
+        _listener = (os.getpid(), thread)
+        thread.start()
+
+
+def _listen(dsn):
+    import psycopg2
+    import psycopg2.extensions
+
+    backoff = 1
+    while True:
+        conn = None
+        try:
+            conn = psycopg2.connect(dsn)
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            conn.cursor().execute(f"LISTEN {CHANNEL}")
+            # Anything sent while we weren't listening is lost.
+            dispatch_all()
+            backoff = 1
+
+            while True:
+                if select.select([conn], [], [], POLL_SECONDS) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    _handle(conn.notifies.pop(0).payload)
+        except Exception as e:
+            print("⚠️ Cache listener disconnected:", e)
+            time.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+def _handle(payload):
+    try:
+        message = json.loads(payload)
+    except ValueError:
+        return
+    if message.get("node") == NODE_ID:
+        return  # already evicted locally after our own commit
+    dispatch(message.get("kind"), message.get("key"))
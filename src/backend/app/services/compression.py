@@ -0,0 +1,104 @@
+# app/services/compression.py
+"""gzip/brotli compression of large text responses, negotiated per request."""
+import zlib
+from flask import request
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "text/csv",
+    "text/html",
+    "text/plain",
+}
+DEFAULT_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+# Brotli's default quality (11) is meant for static assets; 4 suits per-request work
+BROTLI_QUALITY = 4
+
+_brotli = None
+
+
+def _brotli_module():
+    """The brotli module, or False if it isn't installed (checked once)."""
+    global _brotli
+    if _brotli is None:
+        try:
+            import brotli
+            _brotli = brotli
+        except ImportError:
+            _brotli = False
+    return _brotli
+
+
+def negotiate(accept_encodings):
+    """Pick "br" or "gzip" from an Accept-Encoding header, or None."""
+    if accept_encodings["br"] and _brotli_module():
+        return "br"
+    if accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+def compressor(encoding):
+    """(compress, flush) callables for an incremental encoder."""
+    if encoding == "br":
+        encoder = _brotli_module().Compressor(quality=BROTLI_QUALITY)
+        return encoder.process, encoder.finish
+    encoder = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+    return encoder.compress, encoder.flush
+
+
+def compress_body(data, encoding):
+    compress, flush = compressor(encoding)
+    return compress(data) + flush()
+
+
+def _compress_stream(chunks, encoding):
+    compress, flush = compressor(encoding)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        out = compress(chunk)
+        if out:
+            yield out
+    yield flush()
+
+
+def compress_response(response, min_size=DEFAULT_MIN_SIZE):
+    if response.mimetype not in COMPRESSIBLE_TYPES:
+        return response
+    response.vary.add("Accept-Encoding")
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or request.method == "HEAD"
+    ):
+        return response
+
+    encoding = negotiate(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        response.set_data(compress_body(data, encoding))
+
+    response.headers["Content-Encoding"] = encoding
+    # The encoded bytes differ from the identity body the ETag was computed on
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    @app.after_request
+    def compress(response):
+        return compress_response(response, app.config.get("COMPRESS_MIN_SIZE", DEFAULT_MIN_SIZE))
@@ -0,0 +1,115 @@
+# app/services/dataset_import.py
+"""Stream CSV/Parquet training rows into the data table with COPY."""
+import io
+from app import db
+from app.models import DataSet
+from app.services import cache_bus
+from app.services.knn_engine import STRANDS
+
+SCORE_COLUMNS = ("stem_score", "abm_score", "humss_score")
+COLUMNS = (*SCORE_COLUMNS, "strand")
+DEFAULT_CHUNK_SIZE = 50_000
+# Placeholder until k selection has run for the new dataset.
+DEFAULT_BEST_K = 5
+
+COPY_SQL = (
+    "COPY data (data_set_id, stem_score, abm_score, humss_score, strand) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+
+def read_chunks(source, file_format="csv", chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield DataFrames of at most ``chunk_size`` rows from a path or file object."""
+    if file_format == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet import requires pyarrow to be installed.")
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif file_format == "csv":
+        import pandas as pd
+        yield from pd.read_csv(source, chunksize=chunk_size, dtype=str, skipinitialspace=True)
+    else:
+        raise ValueError(f"Unsupported file format: {file_format}")
+
+
+def clean_chunk(df, first_row):
+    """Validate one chunk and return it as (stem, abm, humss, strand) columns.
+
+    ``first_row`` is the 1-based file row of the chunk's first record, used in
+    error messages.
+    """
+    import pandas as pd
+
+    df = df.rename(columns=lambda c: str(c).strip().lower())
+    missing = [c for c in COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+
+    df = df.loc[:, list(COLUMNS)]
+    for column in SCORE_COLUMNS:
+        values = pd.to_numeric(df[column], errors="coerce")
+        bad = values.isna() | (values % 1 != 0) | (values < 0)
+        if bad.any():
+            row = first_row + int(bad.to_numpy().argmax())
+            raise ValueError(f"Row {row}: {column} must be a non-negative integer")
+        df[column] = values.astype("int64")
+
+    strands = df["strand"].astype(str).str.strip().str.upper()
+    bad = ~strands.isin(STRANDS)
+    if bad.any():
+        row = first_row + int(bad.to_numpy().argmax())
+        raise ValueError(
+            f"Row {row}: strand must be one of {', '.join(STRANDS)}, got {df['strand'].iloc[row - first_row]!r}"
+        )
+    df["strand"] = strands
+    return df
+
+
+def import_dataset(source, data_set_name, question_set_id, description=None,
+                   file_format="csv", chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Create a DataSet and COPY every row of ``source`` into it in one transaction.
+
+    Memory use is bounded by ``chunk_size``. Any invalid row rolls the whole
+    import back. Returns ``{"data_set_id", "rows"}``.
+    """
+    dataset = DataSet(
+        data_set_name=data_set_name,
+        question_set_id=question_set_id,
+        best_k=DEFAULT_BEST_K,
+        accuracy=0.0,
+        status="Inactive",
+    )
+    if description:
+        dataset.data_set_description = description
+
+    try:
+        db.session.add(dataset)
+        db.session.flush()
+
+        cursor = db.session.connection().connection.cursor()
+        rows = 0
+        for chunk in read_chunks(source, file_format, chunk_size):
+            chunk = clean_chunk(chunk, first_row=rows + 1)
+            chunk.insert(0, "data_set_id", dataset.data_set_id)
+
+            buffer = io.StringIO()
+            chunk.to_csv(buffer, header=False, index=False)
+            buffer.seek(0)
+            cursor.copy_expert(COPY_SQL, buffer)
+
+            rows += len(chunk)
+            if progress:
+                progress(rows)
+
+        if rows == 0:
+            raise ValueError("The file contains no rows")
+
+        cache_bus.publish("dataset", dataset.data_set_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return {"data_set_id": dataset.data_set_id, "rows": rows}
@@ -0,0 +1,27 @@
+# app/services/http_cache.py
+"""Pre-serialized JSON bodies served with validators for conditional GETs."""
+import hashlib
+from typing import NamedTuple
+from flask import current_app, request, Response
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: object = None   # datetime or None
+
+
+def serialize(value, last_modified=None):
+    """JSON-encode ``value`` the way jsonify would and tag it with a strong ETag."""
+    body = (current_app.json.dumps(value) + "\n").encode()
+    return CachedBody(body, hashlib.sha1(body).hexdigest(), last_modified)
+
+
+def conditional_json(cached, cache_control="no-cache"):
+    """A JSON response for a CachedBody; 304 if the client's copy is current."""
+    response = Response(cached.body, mimetype="application/json")
+    response.set_etag(cached.etag)
+    if cached.last_modified is not None:
+        response.last_modified = cached.last_modified
+    response.headers["Cache-Control"] = cache_control
+    return response.make_conditional(request)
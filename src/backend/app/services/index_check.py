@@ -0,0 +1,78 @@
+# app/services/index_check.py
+"""EXPLAIN the hot queries and report which index each plan uses."""
+import json
+from sqlalchemy import select, text
+from app import db
+from app.models import Answer, Assessment, DataSet, Neighbors, Question, Results, TieTable
+
+
+def _hot_queries():
+    """(name, statement builder, expected index) for the hot read paths.
+
+    Where a service owns the query, its own builder is used, so the check sees
+    exactly the SQL that runs; the rest mirror the routes' ORM calls.
+    """
+    # Deferred: both pull in numpy
+    from app.services.rescoring import completed_page_query
+    from app.services.training_matrix import training_rows_query
+
+    return [
+        ("answers by assessment",
+         lambda id: select(Answer).where(Answer.assessment_id == id),
+         "uq_assessment_question"),
+        ("questions by set",
+         lambda id: select(Question.question_id, Question.strand).where(Question.set_id == id),
+         "ix_questions_set_id"),
+        ("training rows by dataset", training_rows_query, "ix_data_data_set_id_data_id"),
+        ("active dataset",
+         lambda id: select(DataSet).where(DataSet.status == "Active").limit(1),
+         "ix_data_set_active"),
+        ("assessment by user and dataset",
+         lambda id: select(Assessment).where(Assessment.user_id == id, Assessment.data_set_id == id).limit(1),
+         "ix_assessments_user_id_data_set_id"),
+        ("completed assessments page",
+         lambda id: completed_page_query(id, 0),
+         "ix_assessments_completed_data_set_id"),
+        ("results by assessment",
+         lambda id: select(Results).where(Results.assessment_id == id).limit(1),
+         "ix_results_assessment_id"),
+        ("neighbors by result",
+         lambda id: select(Neighbors).where(Neighbors.results_id == id),
+         "uq_result_neighbor"),
+        ("tie weights by result",
+         lambda id: select(TieTable).where(TieTable.results_id == id),
+         "ix_tie_table_results_id"),
+    ]
+
+
+def _plan_indexes(node):
+    found = set()
+    if "Index Name" in node:
+        found.add(node["Index Name"])
+    for child in node.get("Plans", ()):
+        found |= _plan_indexes(child)
+    return found
+
+
+def check_indexes(sample_id=1):
+    """Return [(name, expected, used indexes, ok)] for every hot query.
+
+    Sequential scans are disabled for the check so small development tables
+    still show whether the planner *can* use the index.
+    """
+    if db.engine.dialect.name != "postgresql":
+        raise ValueError("Index verification needs PostgreSQL.")
+
+    report = []
+    with db.engine.connect() as conn:
+        with conn.begin() as transaction:
+            conn.execute(text("SET LOCAL enable_seqscan = off"))
+            for name, build, expected in _hot_queries():
+                compiled = build(sample_id).compile(dialect=conn.dialect)
+                plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                used = _plan_indexes(plan[0]["Plan"])
+                report.append((name, expected, sorted(used), expected in used))
+            transaction.rollback()
+    return report
@@ -0,0 +1,75 @@
+# app/services/instrumentation.py
+"""Per-request latency and SQL usage, recorded into app.services.metrics.
+
+Requests are labelled by Flask endpoint (e.g. ``assessment.submit_assessment``)
+so slow handlers stand out in the /metrics histograms. SQL statements are
+counted through engine events and attributed to the request that ran them;
+statements from background jobs and CLI commands aren't counted.
+"""
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.services import metrics
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds", "Request latency by endpoint.",
+    labelnames=("endpoint", "method", "status"),
+)
+REQUEST_QUERIES = metrics.histogram(
+    "db_queries_per_request", "SQL statements executed per request.",
+    labelnames=("endpoint",), buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = metrics.histogram(
+    "db_seconds_per_request", "Time spent executing SQL per request.",
+    labelnames=("endpoint",),
+)
+
+
+def init_app(app):
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        g.db_queries = 0
+        g.db_seconds = 0.0
+
+    @app.after_request
+    def remember_status(response):
+        g.response_status = response.status_code
+        return response
+
+    # Teardown also runs for unhandled errors and after streamed bodies finish
+    @app.teardown_request
+    def record_request(exc=None):
+        started = g.pop("request_started", None)
+        if started is None:
+            return
+        endpoint = request.endpoint or "unmatched"
+        status = 500 if exc is not None else g.pop("response_status", 500)
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - started, endpoint=endpoint, method=request.method, status=status,
+        )
+        REQUEST_QUERIES.observe(g.pop("db_queries", 0), endpoint=endpoint)
+        REQUEST_DB_SECONDS.observe(g.pop("db_seconds", 0.0), endpoint=endpoint)
+
+
+# ---------------- Engine hooks ----------------
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    if has_request_context() and "request_started" in g:
+        g.db_queries += 1
+        g.db_seconds += time.perf_counter() - started
+
+
+@event.listens_for(Engine, "handle_error")
+def _forget_failed_query(context):
+    if context.connection is not None and context.connection.info.get("query_started"):
+        context.connection.info["query_started"].pop()
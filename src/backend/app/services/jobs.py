@@ -0,0 +1,58 @@
+# app/services/jobs.py
+"""Minimal in-process background jobs for long-running admin tasks."""
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+
+MAX_JOBS = 100
+
+_jobs = OrderedDict()
+_lock = threading.Lock()
+
+
+def submit(app, name, fn, *args, **kwargs):
+    """Run ``fn(*args, progress=..., **kwargs)`` on a thread inside an app context.
+
+    Returns the job id; poll it with ``get``.
+    """
+    job_id = uuid.uuid4().hex
+    job = {
+        "job_id": job_id,
+        "name": name,
+        "status": "queued",
+        "done": 0,
+        "total": None,
+        "result": None,
+        "error": None,
+    }
+    with _lock:
+        _jobs[job_id] = job
+        while len(_jobs) > MAX_JOBS:
+            _jobs.popitem(last=False)
+
+    def progress(done, total=None):
+        job["done"] = done
+        if total is not None:
+            job["total"] = total
+
+    def run():
+        job["status"] = "running"
+        with app.app_context():
+            try:
+                job["result"] = fn(*args, progress=progress, **kwargs)
+                job["status"] = "done"
+            except Exception as e:
+                print(f"❌ Job {name} ({job_id}) failed:", traceback.format_exc())
+                job["error"] = str(e)
+                job["status"] = "failed"
+
+    threading.Thread(target=run, name=f"job-{name}", daemon=True).start()
+    return job_id
+
+
+def get(job_id):
+    """Return a snapshot of a job's state, or None if it's unknown."""
+    with _lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job else None
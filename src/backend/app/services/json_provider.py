@@ -0,0 +1,39 @@
+# app/services/json_provider.py
+"""Flask JSON provider that uses orjson when it's installed.
+
+Keys stay sorted, as with Flask's default provider, so ETags computed from
+serialized bodies are stable. Dates and datetimes always come out as ISO
+8601 strings, so model ``*_info()`` builders can hand raw column values to
+the serializer instead of formatting every one.
+"""
+import datetime
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib json module
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(o):
+    if isinstance(o, datetime.date):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        # Extra arguments (e.g. indent in debug mode) need the stdlib encoder
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
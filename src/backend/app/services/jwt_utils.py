@@ -1,8 +1,19 @@
 import jwt
+import time
 from datetime import datetime, timedelta
 from flask import current_app
 from functools import wraps
 from flask import request, jsonify
+from app.services import metrics
+from app.services.cache import LRUCache
+
+DEFAULT_TOKEN_CACHE_SIZE = 10_000
+
+# token -> (exp, payload) for tokens whose signature has already been checked
+_verified = LRUCache(DEFAULT_TOKEN_CACHE_SIZE)
+TOKEN_CACHE = metrics.counter(
+    "token_cache_total", "token_required lookups in the verified-token cache.", labelnames=("result",),
+)
 
 def generate_jwt(payload, expires_in=None):
     expires_in = expires_in or current_app.config.get("JWT_EXPIRATION_SECONDS", 3600)
@@ -18,6 +29,28 @@ def decode_jwt(token):
         return None
     except jwt.InvalidTokenError:
         return None
+
+def verify_token(token):
+    """decode_jwt, remembering valid tokens until their ``exp``.
+
+    Returns a fresh copy of the payload each time, since handlers may modify it.
+    Tokens without an ``exp`` are never cached.
+    """
+    entry = _verified.get(token)
+    if entry is not None:
+        exp, payload = entry
+        if time.time() < exp:
+            TOKEN_CACHE.inc(result="hit")
+            return dict(payload)
+        _verified.pop(token)
+
+    TOKEN_CACHE.inc(result="miss")
+    payload = decode_jwt(token)
+    if payload and isinstance(payload.get("exp"), (int, float)):
+        _verified.maxsize = current_app.config.get("TOKEN_CACHE_SIZE", DEFAULT_TOKEN_CACHE_SIZE)
+        _verified.set(token, (payload["exp"], payload))
+        return dict(payload)
+    return payload
     
 def token_required(f):
     @wraps(f)
@@ -26,7 +59,7 @@ def token_required(f):
         if not auth_header or not auth_header.startswith("Bearer "):
             return jsonify({"error": "Authorization header missing"}), 401
         token = auth_header.split(" ")[1]
-        payload = decode_jwt(token)
+        payload = verify_token(token)
         if not payload:
             return jsonify({"error": "Invalid or expired token"}), 401
         return f(payload, *args, **kwargs)
@@ -40,4 +73,20 @@ def create_password_reset_token(user_email, otp):
 
     # Short expiry (e.g., 5 minutes)
     token = generate_jwt(payload, expires_in=300)
-    return token
\ No newline at end of file
+    return token
+
+ADMIN_ROLE = "ADMIN"
+
+def admin_required(f):
+    """token_required, plus the token's user must have the ADMIN role."""
+    @token_required
+    @wraps(f)
+    def decorated(payload, *args, **kwargs):
+        from app import db
+        from app.models import User
+
+        role = db.session.query(User.role).filter(User.user_id == payload.get("user_id")).scalar()
+        if role != ADMIN_ROLE:
+            return jsonify({"error": "Admin access required"}), 403
+        return f(payload, *args, **kwargs)
+    return decorated
@@ -0,0 +1,93 @@
+# app/services/k_selection.py
+"""Pick DataSet.best_k and DataSet.accuracy by stratified cross-validation."""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from app import db
+from app.models import DataSet
+from app.services import cache_bus, knn_engine
+from app.services.training_matrix import TrainingMatrix
+
+DEFAULT_K_VALUES = range(1, 31)
+DEFAULT_FOLDS = 5
+# Below this many rows a process pool costs more than it saves.
+MIN_PARALLEL_ROWS = 20000
+
+
+def _score_fold(train, train_codes, test, test_codes, k_values):
+    """Correct predictions per k for one fold.
+
+    The neighbor ranking for the largest k is computed once and sliced for
+    every smaller k, so the distance matrix is shared by all candidates.
+    """
+    indices, distances = knn_engine.kneighbors(train, test, max(k_values))
+    codes = train_codes[indices]
+    correct = []
+    for k in k_values:
+        recommendation = knn_engine.vote(codes[:, :k], distances[:, :k])[-1]
+        correct.append(int((recommendation == test_codes).sum()))
+    return correct
+
+
+def select_best_k(data_set_id, k_values=DEFAULT_K_VALUES, folds=DEFAULT_FOLDS,
+                  workers=None, progress=None):
+    """Cross-validate each k on the dataset's rows and store the winner.
+
+    Folds run in parallel on a process pool; ties in accuracy go to the
+    smaller k. Returns ``{"best_k", "accuracy", "scores"}``.
+    """
+    from sklearn.model_selection import StratifiedKFold
+
+    dataset = DataSet.query.get(data_set_id)
+    if not dataset:
+        raise ValueError(f"Dataset with id {data_set_id} not found.")
+
+    matrix = TrainingMatrix.load(data_set_id)
+    X, y = matrix.features, np.minimum(matrix.codes, knn_engine.UNKNOWN_STRAND)
+
+    counts = np.bincount(y)
+    n_splits = min(folds, int(counts[counts > 0].min())) if len(y) else 0
+    if n_splits < 2:
+        raise ValueError("Every strand needs at least 2 rows to cross-validate.")
+
+    splits = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42).split(X, y))
+    smallest_train = min(len(train) for train, _ in splits)
+    k_values = [k for k in k_values if k <= smallest_train]
+    if not k_values:
+        raise ValueError("Not enough rows for any candidate k.")
+
+    tasks = [(X[train], y[train], X[test], y[test], k_values) for train, test in splits]
+    if progress:
+        progress(0, len(tasks))
+
+    workers = workers or min(len(tasks), os.cpu_count() or 1)
+    fold_scores = []
+    if workers > 1 and len(X) >= MIN_PARALLEL_ROWS:
+        # Spawn rather than fork: this usually runs on a background thread.
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            for correct in pool.map(_score_fold, *zip(*tasks)):
+                fold_scores.append(correct)
+                if progress:
+                    progress(len(fold_scores), len(tasks))
+    else:
+        for task in tasks:
+            fold_scores.append(_score_fold(*task))
+            if progress:
+                progress(len(fold_scores), len(tasks))
+
+    accuracy = np.sum(fold_scores, axis=0) / len(X)
+    best = int(np.argmax(accuracy))
+
+    dataset.best_k = k_values[best]
+    dataset.accuracy = float(accuracy[best])
+    cache_bus.publish("dataset", data_set_id)
+    db.session.commit()
+
+    return {
+        "data_set_id": data_set_id,
+        "best_k": dataset.best_k,
+        "accuracy": dataset.accuracy,
+        "scores": {k: float(a) for k, a in zip(k_values, accuracy)},
+    }
@@ -0,0 +1,184 @@
+# app/services/knn_engine.py
+"""Vectorized KNN scoring over integer-encoded strands.
+
+Neighbors are ordered by (distance, training row), and votes, ties and
+inverse-distance tie weights follow the same rules as ``KNN.predict``:
+the first strand in STRANDS order wins a plain vote, and a tie goes to the
+tied strand with the largest summed ``1 / distance`` (``1.0`` for exact
+matches), again taking the first in STRANDS order on equal weights.
+"""
+from typing import NamedTuple
+import numpy as np
+
+STRANDS = ("STEM", "HUMSS", "ABM")
+SCORE_KEYS = ("stem_score", "humss_score", "abm_score")
+WEIGHT_KEYS = ("stem_weight", "humss_weight", "abm_weight")
+UNKNOWN_STRAND = len(STRANDS)
+
+# Rows of the (chunk, n_train) distance matrix built at once.
+CHUNK_CELLS = 4_000_000
+
+
+class BatchResult(NamedTuple):
+    indices: np.ndarray       # (N, k) training row of each neighbor
+    distances: np.ndarray     # (N, k) euclidean distance
+    codes: np.ndarray         # (N, k) strand code of each neighbor
+    votes: np.ndarray         # (N, 3) neighbor count per strand
+    tie: np.ndarray           # (N,) more than one strand shares the top vote
+    tied: np.ndarray          # (N, 3) strands taking part in the tie
+    tie_weights: np.ndarray   # (N, 3) summed inverse distances, 0 if not tied
+    recommendation: np.ndarray  # (N,) strand code
+
+
+def encode_strands(strand_list):
+    """Map strand labels to codes; anything unexpected becomes UNKNOWN_STRAND.
+
+    Codes at or above UNKNOWN_STRAND never receive a vote.
+    """
+    lookup = {s: i for i, s in enumerate(STRANDS)}
+    return np.fromiter(
+        (lookup.get(s, UNKNOWN_STRAND) for s in strand_list),
+        dtype=np.uint8,
+        count=len(strand_list),
+    )
+
+
+def pairwise_distances(train, samples):
+    """Euclidean distances, shape (len(samples), len(train)).
+
+    Squared differences are summed column by column rather than through the
+    dot-product expansion, so integer inputs give exactly rounded results.
+    ``train`` may be any numeric dtype; it's widened one column at a time.
+    """
+    train = np.asarray(train)
+    samples = np.asarray(samples, dtype=np.float64)
+    sq = np.zeros((samples.shape[0], train.shape[0]))
+    for col in range(train.shape[1]):
+        diff = samples[:, col, None] - train[None, :, col]
+        sq += diff * diff
+    return np.sqrt(sq, out=sq)
+
+
+def _nearest(dist, k):
+    """Indices of the k smallest entries per row, ordered by (distance, column)."""
+    n, m = dist.shape
+    if k >= m:
+        return np.argsort(dist, axis=1, kind="stable")[:, :k]
+
+    kth = np.partition(dist, k - 1, axis=1)[:, k - 1:k]
+    below = dist < kth
+    at = dist == kth
+    # Take the lowest-numbered training rows among those tied on the k-th distance.
+    need = k - below.sum(axis=1, keepdims=True)
+    chosen = below | (at & (np.cumsum(at, axis=1) <= need))
+
+    idx = np.nonzero(chosen)[1].reshape(n, k)
+    order = np.argsort(np.take_along_axis(dist, idx, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(idx, order, axis=1)
+
+
+def kneighbors(train, samples, k):
+    """Return (indices, distances) of the k nearest training rows per sample."""
+    samples = np.atleast_2d(np.asarray(samples, dtype=np.float64))
+    n, m = samples.shape[0], len(train)
+    k = min(k, m)
+    step = max(1, CHUNK_CELLS // max(m, 1))
+
+    indices = np.empty((n, k), dtype=np.int64)
+    distances = np.empty((n, k), dtype=np.float64)
+    for start in range(0, n, step):
+        dist = pairwise_distances(train, samples[start:start + step])
+        idx = _nearest(dist, k)
+        indices[start:start + step] = idx
+        distances[start:start + step] = np.take_along_axis(dist, idx, axis=1)
+    return indices, distances
+
+
+def vote(codes, distances):
+    """Count votes and break ties for neighbor strand codes of shape (N, k)."""
+    # Codes past STRANDS (strands nobody votes for) all share the spare slot
+    codes = np.minimum(codes, UNKNOWN_STRAND)
+    n, k = codes.shape
+    n_strands = len(STRANDS)
+
+    flat = codes.astype(np.int64) + (n_strands + 1) * np.arange(n)[:, None]
+    votes = np.bincount(flat.ravel(), minlength=n * (n_strands + 1))
+    votes = votes.reshape(n, n_strands + 1)[:, :n_strands]
+
+    top = votes.max(axis=1, keepdims=True)
+    tied = votes == top
+    tie = tied.sum(axis=1) > 1
+
+    inverse = np.divide(1.0, distances, out=np.ones_like(distances), where=distances != 0)
+    weights = np.zeros((n, n_strands + 1))
+    rows = np.arange(n)
+    # Accumulate neighbor by neighbor so each sum is added in the same order
+    # as the per-sample tie breaker.
+    for j in range(k):
+        weights[rows, codes[:, j]] += inverse[:, j]
+    weights = weights[:, :n_strands]
+    tied &= tie[:, None]
+    weights[~tied] = 0.0
+
+    recommendation = np.where(
+        tie,
+        np.where(tied, weights, -np.inf).argmax(axis=1),
+        votes.argmax(axis=1),
+    )
+    return votes, tie, tied, weights, recommendation
+
+
+def kneighbors_deduped(points, offsets, members, samples, k):
+    """kneighbors over collapsed duplicate rows, with the same output as the raw search.
+
+    ``points`` are the distinct score vectors; the raw rows at ``points[p]``
+    are ``members[offsets[p]:offsets[p + 1]]`` in ascending order. Distances
+    are computed per distinct point, then expanded back into raw rows in
+    (distance, row) order: within a distance group only the lowest-numbered
+    rows that still fit in k are taken, however many duplicates a point has.
+    """
+    samples = np.atleast_2d(np.asarray(samples, dtype=np.float64))
+    n, u = samples.shape[0], len(points)
+    k = min(k, len(members))
+    kk = min(k, u)
+    # No point contributes more than k rows, so cap the expansion there.
+    counts = np.minimum(np.diff(offsets), k)
+    step = max(1, CHUNK_CELLS // max(u, 1))
+
+    indices = np.empty((n, k), dtype=np.int64)
+    distances = np.empty((n, k), dtype=np.float64)
+    for start in range(0, n, step):
+        dist = pairwise_distances(points, samples[start:start + step])
+        # The kk nearest distinct points hold at least k rows between them.
+        kth = np.partition(dist, kk - 1, axis=1)[:, kk - 1:kk]
+        flat = np.flatnonzero(dist <= kth)
+        rows, cand = np.divmod(flat, u)
+
+        # One entry per (sample, raw row) of every candidate point
+        taken = counts[cand]
+        first = np.repeat(np.cumsum(taken) - taken, taken)
+        rank = np.arange(first.size) - first
+        raw_rows = np.repeat(rows, taken)
+        raw = members[np.repeat(offsets[cand], taken) + rank]
+        raw_dist = np.repeat(dist.ravel()[flat], taken)
+
+        # Sorted by (sample, distance, raw row); each sample keeps its first k.
+        order = np.lexsort((raw, raw_dist, raw_rows))
+        per_row = np.bincount(raw_rows, minlength=len(dist))
+        pick = order[(np.cumsum(per_row) - per_row)[:, None] + np.arange(k)]
+        indices[start:start + step] = raw[pick]
+        distances[start:start + step] = raw_dist[pick]
+    return indices, distances
+
+
+def score_neighbors(indices, distances, strand_codes):
+    """Votes and tie breaking for already-found neighbors."""
+    codes = np.asarray(strand_codes)[indices]
+    votes, tie, tied, weights, recommendation = vote(codes, distances)
+    return BatchResult(indices, distances, codes, votes, tie, tied, weights, recommendation)
+
+
+def batch_predict(train, strand_codes, k, samples):
+    """Score every row of ``samples`` (N, 3) against the training matrix."""
+    indices, distances = kneighbors(train, samples, k)
+    return score_neighbors(indices, distances, strand_codes)
@@ -0,0 +1,199 @@
+# app/services/lookup_cube.py
+"""Precomputed KNN results for every reachable (stem, abm, humss) total.
+
+Each strand total is bounded by the number of that strand's questions times
+MAX_ANSWER_VALUE, so the reachable inputs form a small integer lattice. The
+cube stores the recommendation, votes and tie weights for every cell; scoring
+a submission becomes an index into it. Vectors outside the lattice (or
+non-integral ones) fall back to the live model.
+"""
+import io
+import threading
+import numpy as np
+from sqlalchemy import func
+from app import db
+from app.models import DataSet, DataSetLookup, Question
+from app.services import cache_bus, model_registry
+from app.services.knn_engine import STRANDS, SCORE_KEYS, WEIGHT_KEYS
+
+MAX_ANSWER_VALUE = 5
+BUILD_BATCH = 20_000
+
+
+class LookupCube:
+    def __init__(self, shape, k, recommendation, votes, tie_slot, tie_weights):
+        self.shape = shape
+        self.k = k
+        self.recommendation = recommendation  # (cells,) strand code
+        self.votes = votes                    # (cells, 3)
+        self.tie_slot = tie_slot              # (cells,) row in tie_weights, -1 if no tie
+        self.tie_weights = tie_weights        # (ties, 3), 0 for strands not in the tie
+
+    def cell(self, sample):
+        """Flat cell index for a sample, or None if it's off the lattice."""
+        if len(sample) != len(self.shape):
+            return None
+        coords = []
+        for value, size in zip(sample, self.shape):
+            if value is None or value != int(value) or not 0 <= value < size:
+                return None
+            coords.append(int(value))
+        return int(np.ravel_multi_index(coords, self.shape))
+
+    def score(self, sample):
+        """Result dict in KNN.predict's shape, without neighbors; None if off-lattice."""
+        cell = self.cell(sample)
+        if cell is None:
+            return None
+
+        strand_votes = {key: int(v) for key, v in zip(SCORE_KEYS, self.votes[cell])}
+        strand_votes["neighbors"] = []
+        strand_votes["k"] = self.k
+
+        slot = self.tie_slot[cell]
+        if slot >= 0:
+            top = self.votes[cell].max()
+            strand_votes["tie"] = True
+            strand_votes["tie_strands"] = {
+                key: float(w)
+                for key, w, v in zip(WEIGHT_KEYS, self.tie_weights[slot], self.votes[cell])
+                if v == top
+            }
+        else:
+            strand_votes["tie"] = False
+            strand_votes["tie_strands"] = None
+
+        strand_votes["recommendation"] = STRANDS[self.recommendation[cell]]
+        return strand_votes
+
+    def to_bytes(self):
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            recommendation=self.recommendation,
+            votes=self.votes,
+            tie_slot=self.tie_slot,
+            tie_weights=self.tie_weights,
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_row(cls, row):
+        arrays = np.load(io.BytesIO(row.payload))
+        shape = (row.stem_max + 1, row.abm_max + 1, row.humss_max + 1)
+        return cls(
+            shape, row.best_k, arrays["recommendation"], arrays["votes"],
+            arrays["tie_slot"], arrays["tie_weights"],
+        )
+
+
+def strand_bounds(question_set_id):
+    """Largest reachable (stem, abm, humss) totals for a question set."""
+    counts = dict(
+        db.session.query(Question.strand, func.count(Question.question_id))
+        .filter(Question.set_id == question_set_id)
+        .group_by(Question.strand)
+        .all()
+    )
+    return tuple(counts.get(s, 0) * MAX_ANSWER_VALUE for s in ("STEM", "ABM", "HUMSS"))
+
+
+def build_lookup(data_set_id, max_cells=None, progress=None):
+    """Score every lattice cell with the dataset's model and persist the cube."""
+    dataset = DataSet.query.get(data_set_id)
+    if not dataset:
+        raise ValueError(f"Dataset with id {data_set_id} not found.")
+
+    bounds = strand_bounds(dataset.question_set_id)
+    shape = tuple(b + 1 for b in bounds)
+    cells = int(np.prod(shape))
+    if max_cells is not None and cells > max_cells:
+        raise ValueError(f"Lookup cube would have {cells} cells (limit {max_cells}).")
+
+    model = model_registry.get_model(data_set_id)
+    vote_dtype = np.uint8 if model.k <= np.iinfo(np.uint8).max else np.uint16
+    recommendation = np.empty(cells, dtype=np.uint8)
+    votes = np.empty((cells, len(STRANDS)), dtype=vote_dtype)
+    tie_slot = np.full(cells, -1, dtype=np.int32)
+    tie_weights = []
+
+    if progress:
+        progress(0, cells)
+    for start in range(0, cells, BUILD_BATCH):
+        flat = np.arange(start, min(start + BUILD_BATCH, cells))
+        samples = np.stack(np.unravel_index(flat, shape), axis=1)
+        batch = model.predict_batch(samples)
+
+        recommendation[flat] = batch.recommendation
+        votes[flat] = batch.votes
+        tied = np.flatnonzero(batch.tie)
+        tie_slot[flat[tied]] = np.arange(len(tied)) + sum(len(w) for w in tie_weights)
+        tie_weights.append(batch.tie_weights[tied])
+        if progress:
+            progress(int(flat[-1]) + 1, cells)
+
+    cube = LookupCube(
+        shape, model.k, recommendation, votes, tie_slot,
+        np.concatenate(tie_weights) if tie_weights else np.empty((0, len(STRANDS))),
+    )
+
+    row = db.session.get(DataSetLookup, data_set_id) or DataSetLookup(data_set_id=data_set_id)
+    row.version = dataset.last_updated
+    row.best_k = dataset.best_k
+    row.stem_max, row.abm_max, row.humss_max = bounds
+    row.payload = cube.to_bytes()
+    db.session.add(row)
+    cache_bus.publish("lookup", data_set_id)
+    db.session.commit()
+
+    with _lock:
+        _cubes[data_set_id] = ((row.version, row.best_k), cube)
+    return row.lookup_info()
+
+
+# ---------------- Process cache ----------------
+# data_set_id -> ((last_updated, best_k), LookupCube or None)
+_cubes = {}
+_lock = threading.Lock()
+
+
+def get_lookup(data_set_id):
+    """The dataset's cube if one was built for its current version, else None."""
+    current = (
+        db.session.query(DataSet.last_updated, DataSet.best_k)
+        .filter(DataSet.data_set_id == data_set_id)
+        .first()
+    )
+    if current is None:
+        return None
+    version = (current.last_updated, current.best_k)
+
+    entry = _cubes.get(data_set_id)
+    if entry and entry[0] == version:
+        return entry[1]
+
+    row = db.session.get(DataSetLookup, data_set_id)
+    cube = None
+    if row is not None and (row.version, row.best_k) == version:
+        cube = LookupCube.from_row(row)
+    with _lock:
+        _cubes[data_set_id] = (version, cube)
+    return cube
+
+
+def evict(data_set_id=None):
+    with _lock:
+        if data_set_id is None:
+            _cubes.clear()
+        else:
+            _cubes.pop(data_set_id, None)
+
+
+cache_bus.subscribe("dataset", evict)
+cache_bus.subscribe("lookup", evict)
+
+
+def score(data_set_id, sample):
+    """Look a sample up in the dataset's cube; None means use the live model."""
+    cube = get_lookup(data_set_id)
+    return cube.score(sample) if cube is not None else None
@@ -0,0 +1,228 @@
+# app/services/mail_queue.py
+"""Outbound mail, sent from worker threads instead of the request thread.
+
+``submit`` puts a message on a bounded queue and returns a delivery id right
+away; ``status`` reports what happened to it. Each worker keeps one
+authenticated transport open between messages (reconnecting after errors or
+once it has been idle for IDLE_SECONDS) and retries transient failures with
+exponential backoff.
+
+To try it locally, run a debugging SMTP server and point the app at it::
+
+    python -m aiosmtpd -n -l localhost:1025     # or, on Python <= 3.11:
+    python -m smtpd -n -c DebuggingServer localhost:1025
+
+    SMTP_SERVER=localhost SMTP_PORT=1025 SMTP_USE_TLS=false flask --app run send-test-email --to you@example.com
+"""
+import os
+import queue
+import random
+import smtplib
+import ssl
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+IDLE_SECONDS = 30
+MAX_BACKOFF_SECONDS = 60
+MAX_STATUSES = 1000
+
+# Errors retrying won't fix.
+PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPAuthenticationError)
+
+
+class SMTPTransport:
+    """One SMTP connection, opened on first send and reused after that."""
+
+    def __init__(self, host, port, sender, password=None, use_tls=True, timeout=10):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self._server = None
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            import certifi
+
+            server.starttls(context=ssl.create_default_context(cafile=certifi.where()))
+        if self.password:
+            server.login(self.sender, self.password)
+        return server
+
+    def send(self, to, subject, html):
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = subject
+        msg["From"] = self.sender
+        msg["To"] = to
+        msg.attach(MIMEText(html, "html"))
+
+        if self._server is None:
+            self._server = self._connect()
+        self._server.sendmail(self.sender, [to], msg.as_string())
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+
+class SendGridTransport:
+    """SendGrid's HTTP API; the client (and its connection pool) is reused."""
+
+    def __init__(self, api_key, sender):
+        from sendgrid import SendGridAPIClient
+
+        self.sender = sender
+        self._client = SendGridAPIClient(api_key)
+
+    def send(self, to, subject, html):
+        from sendgrid.helpers.mail import Mail
+
+        response = self._client.send(
+            Mail(from_email=self.sender, to_emails=to, subject=subject, html_content=html)
+        )
+        if response.status_code >= 300:
+            raise RuntimeError(f"SendGrid returned {response.status_code}")
+
+    def close(self):
+        pass
+
+
+def transport_factory(config):
+    """Build a zero-argument transport constructor from app config."""
+    sender = config.get("SENDER_EMAIL")
+    if config.get("SENDGRID_API_KEY"):
+        api_key = config["SENDGRID_API_KEY"]
+        return lambda: SendGridTransport(api_key, sender)
+
+    host = config.get("SMTP_SERVER") or "smtp.gmail.com"
+    port = int(config.get("SMTP_PORT") or 587)
+    password = config.get("APP_PASSWORD")
+    use_tls = config.get("SMTP_USE_TLS", True)
+    return lambda: SMTPTransport(host, port, sender, password, use_tls)
+
+
+class MailQueue:
+    def __init__(self, make_transport, workers=2, maxsize=1000, max_attempts=4, backoff=1.0):
+        self.make_transport = make_transport
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._queue = queue.Queue(maxsize)
+        self._statuses = OrderedDict()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _start(self):
+        """Start the workers once per process (after any fork)."""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            for i in range(self.workers):
+                threading.Thread(target=self._work, name=f"mail-{i}", daemon=True).start()
+
+    def submit(self, to, subject, html):
+        """Queue a message; returns its delivery id, or None if the queue is full."""
+        self._start()
+        delivery_id = uuid.uuid4().hex
+        status = {"delivery_id": delivery_id, "status": "queued", "attempts": 0, "error": None}
+        with self._lock:
+            self._statuses[delivery_id] = status
+            while len(self._statuses) > MAX_STATUSES:
+                self._statuses.popitem(last=False)
+        try:
+            self._queue.put_nowait((status, to, subject, html))
+        except queue.Full:
+            with self._lock:
+                self._statuses.pop(delivery_id, None)
+            return None
+        return delivery_id
+
+    def status(self, delivery_id):
+        """Return a snapshot of a delivery's state, or None if it's unknown."""
+        with self._lock:
+            status = self._statuses.get(delivery_id)
+            return dict(status) if status else None
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _work(self):
+        transport = None
+        while True:
+            try:
+                item = self._queue.get(timeout=IDLE_SECONDS)
+            except queue.Empty:
+                # Close it before the server's idle timeout does.
+                if transport is not None:
+                    transport.close()
+                    transport = None
+                continue
+
+            status, to, subject, html = item
+            try:
+                transport = self._deliver(transport, status, to, subject, html)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, transport, status, to, subject, html):
+        """Send with retries; returns the transport to keep for the next message."""
+        while True:
+            status["attempts"] += 1
+            status["status"] = "sending"
+            try:
+                if transport is None:
+                    transport = self.make_transport()
+                transport.send(to, subject, html)
+                status["status"] = "sent"
+                status["error"] = None
+                return transport
+            except Exception as e:
+                status["error"] = str(e)
+                # The connection may be half-open; start the next try clean.
+                if transport is not None:
+                    transport.close()
+                    transport = None
+                if isinstance(e, PERMANENT_ERRORS) or status["attempts"] >= self.max_attempts:
+                    print(f"❌ Mail to {to} failed after {status['attempts']} attempt(s):", traceback.format_exc())
+                    status["status"] = "failed"
+                    return None
+                status["status"] = "retrying"
+                delay = min(self.backoff * 2 ** (status["attempts"] - 1), MAX_BACKOFF_SECONDS)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+
+
+_mailer = None
+_mailer_lock = threading.Lock()
+
+
+def init_app(app):
+    global _mailer
+    with _mailer_lock:
+        _mailer = MailQueue(
+            transport_factory(app.config),
+            workers=app.config.get("MAIL_WORKERS", 2),
+            maxsize=app.config.get("MAIL_QUEUE_SIZE", 1000),
+            max_attempts=app.config.get("MAIL_MAX_ATTEMPTS", 4),
+            backoff=app.config.get("MAIL_RETRY_BACKOFF", 1.0),
+        )
+
+
+def submit(to, subject, html):
+    return _mailer.submit(to, subject, html)
+
+
+def status(delivery_id):
+    return _mailer.status(delivery_id)
@@ -0,0 +1,121 @@
+# app/services/model_registry.py
+import threading
+import time
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from app import db
+from app.models import Data, DataSet
+from app.services import cache_bus, metrics, model_store
+
+FIT_SECONDS = metrics.histogram(
+    "knn_fit_seconds", "Time to load a dataset's model, from the shared store or by fitting it.",
+    labelnames=("data_set_id", "source"),
+)
+
+# data_set_id -> (version, KNN). The version is (last_updated, best_k) so a
+# retrained or edited dataset is refitted on the next request.
+_models = {}
+_lock = threading.Lock()
+
+
+def get_model(data_set_id):
+    """Return the fitted KNN for a dataset, building it on first use."""
+    # Deferred so numpy isn't loaded until a model is actually needed
+    from app.services.KNN import KNN
+    from app.services.training_matrix import TrainingMatrix
+
+    row = (
+        db.session.query(DataSet.last_updated, DataSet.best_k)
+        .filter(DataSet.data_set_id == data_set_id)
+        .first()
+    )
+    if row is None:
+        raise ValueError(f"Dataset with id {data_set_id} not found.")
+    version = (row.last_updated, row.best_k)
+
+    entry = _models.get(data_set_id)
+    if entry and entry[0] == version:
+        return entry[1]
+
+    with _lock:
+        entry = _models.get(data_set_id)
+        if entry and entry[0] == version:
+            return entry[1]
+
+        # Another worker may already have published this version
+        started = time.perf_counter()
+        attached = model_store.attach(data_set_id, version)
+        if attached:
+            model = KNN(attached[0], row.best_k, points=attached[1], data_set_id=data_set_id)
+            source = "store"
+        else:
+            matrix = TrainingMatrix.load(data_set_id)
+            if not len(matrix):
+                raise LookupError(f"No training data found for dataset {data_set_id}.")
+            model = KNN(matrix, row.best_k, data_set_id=data_set_id)
+            model_store.publish(data_set_id, version, matrix, model.points)
+            source = "fit"
+        FIT_SECONDS.observe(time.perf_counter() - started, data_set_id=data_set_id, source=source)
+        _models[data_set_id] = (version, model)
+        return model
+
+
+def invalidate(data_set_id=None):
+    """Drop one cached model, or all of them when no id is given, here and in the store."""
+    evict(data_set_id)
+    model_store.discard(data_set_id)
+
+
+def evict(data_set_id=None):
+    """Forget this process's copy only."""
+    with _lock:
+        if data_set_id is None:
+            _models.clear()
+        else:
+            _models.pop(data_set_id, None)
+
+
+# The model store may be per-instance, so other nodes discard their copy too
+cache_bus.subscribe("dataset", invalidate)
+
+
+# ---------------- Session hooks ----------------
+# Track every flushed change to either table and evict the affected datasets
+# once the transaction commits. Data edits also bump their DataSet's
+# last_updated, so versions persisted elsewhere (lookup cubes, the model
+# store) stop matching too.
+@event.listens_for(Session, "before_flush")
+def _collect_changed_datasets(session, flush_context, instances):
+    stale = session.info.setdefault("stale_data_sets", set())
+    edited = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Data, DataSet)) and obj.data_set_id is not None:
+            stale.add(obj.data_set_id)
+            if isinstance(obj, Data):
+                edited.add(obj.data_set_id)
+
+    with session.no_autoflush:
+        for data_set_id in edited:
+            dataset = session.get(DataSet, data_set_id)
+            if dataset is not None and dataset not in session.deleted:
+                dataset.last_updated = func.now()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_new_datasets(session, flush_context):
+    # New rows only get their data_set_id after the INSERT.
+    stale = session.info.setdefault("stale_data_sets", set())
+    for obj in session.new:
+        if isinstance(obj, (Data, DataSet)) and obj.data_set_id is not None:
+            stale.add(obj.data_set_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_changed_datasets(session):
+    for data_set_id in session.info.pop("stale_data_sets", ()):
+        invalidate(data_set_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changed_datasets(session, previous_transaction):
+    session.info.pop("stale_data_sets", None)
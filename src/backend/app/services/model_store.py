@@ -0,0 +1,144 @@
+# app/services/model_store.py
+"""Training arrays published once per dataset version as memory-mapped .npy files.
+
+Every worker attaches to the same files read-only, so the page cache holds a
+single copy however many workers there are, and a fresh worker loads a
+dataset without reading its rows from Postgres. ``manifest.json`` maps each
+data_set_id to the directory of its current version.
+"""
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from flask import current_app
+
+MANIFEST = "manifest.json"
+
+# Resolved on first use so invalidation can run outside an app context.
+_root = None
+
+
+def store_root():
+    global _root
+    if _root is None:
+        try:
+            _root = current_app.config.get("MODEL_STORE_DIR") or os.path.join(
+                current_app.instance_path, "models"
+            )
+        except RuntimeError:
+            return None
+    return _root
+
+
+def version_key(version):
+    """Serializable form of a registry version (last_updated, best_k)."""
+    last_updated, best_k = version
+    return f"{last_updated.isoformat() if last_updated else ''}|{best_k}"
+
+
+@contextmanager
+def _locked_manifest(root):
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, ".lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield _read_manifest(root)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(root, manifest):
+    fd, tmp = tempfile.mkstemp(dir=root, suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(root, MANIFEST))
+
+
+def attach(data_set_id, version):
+    """Map a published matrix read-only; returns (TrainingMatrix, DedupedPoints or None) or None."""
+    import numpy as np
+    from app.services.training_matrix import TrainingMatrix, DedupedPoints
+
+    root = store_root()
+    if not root:
+        return None
+    entry = _read_manifest(root).get(str(data_set_id))
+    if not entry or entry["version"] != version_key(version):
+        return None
+
+    path = os.path.join(root, entry["dir"])
+
+    def load(name):
+        return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+    try:
+        matrix = TrainingMatrix(load("features"), load("codes"), entry["labels"], load("data_ids"))
+        points = None
+        if entry.get("deduplicated"):
+            points = DedupedPoints(load("points"), load("offsets"), load("members"))
+    except OSError:
+        return None
+    return matrix, points
+
+
+def publish(data_set_id, version, matrix, points=None):
+    """Write a dataset's arrays and point the manifest at them. Best effort."""
+    import numpy as np
+    from app.services.training_matrix import DedupedPoints
+
+    root = store_root()
+    if not root:
+        return
+    name = f"{data_set_id}-{uuid.uuid4().hex[:12]}"
+    try:
+        os.makedirs(root, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=root, prefix=".tmp-")
+        np.save(os.path.join(tmp, "features.npy"), matrix.features)
+        np.save(os.path.join(tmp, "codes.npy"), matrix.codes)
+        np.save(os.path.join(tmp, "data_ids.npy"), matrix.data_ids)
+        if points is not None:
+            for field in DedupedPoints.__slots__:
+                np.save(os.path.join(tmp, f"{field}.npy"), getattr(points, field))
+        os.rename(tmp, os.path.join(root, name))
+
+        with _locked_manifest(root) as manifest:
+            old = manifest.get(str(data_set_id))
+            manifest[str(data_set_id)] = {
+                "version": version_key(version),
+                "dir": name,
+                "labels": list(matrix.labels),
+                "deduplicated": points is not None,
+            }
+            _write_manifest(root, manifest)
+        # Workers still mapping the old files keep them alive until they unmap.
+        if old:
+            shutil.rmtree(os.path.join(root, old["dir"]), ignore_errors=True)
+    except OSError as e:
+        print(f"⚠️ Could not publish model for dataset {data_set_id}:", e)
+
+
+def discard(data_set_id=None):
+    """Drop one dataset (or all) from the manifest so nobody attaches to it again."""
+    root = store_root()
+    if not root or not os.path.isdir(root):
+        return
+    try:
+        with _locked_manifest(root) as manifest:
+            ids = list(manifest) if data_set_id is None else [str(data_set_id)]
+            removed = [manifest.pop(i) for i in ids if i in manifest]
+            _write_manifest(root, manifest)
+        for entry in removed:
+            shutil.rmtree(os.path.join(root, entry["dir"]), ignore_errors=True)
+    except OSError as e:
+        print("⚠️ Could not update model store manifest:", e)
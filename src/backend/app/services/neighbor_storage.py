@@ -0,0 +1,90 @@
+# app/services/neighbor_storage.py
+"""Persist and read back the k nearest neighbors of a Results row.
+
+In "packed" mode (the default) the neighbors live in three parallel array
+columns on Results, keyed by Data.data_id; submitting writes no extra rows and
+reading needs no extra query. "rows" mode keeps the old one-Neighbors-row-per-
+neighbor layout, and results stored that way stay readable in either mode.
+"""
+from flask import current_app
+from app import db
+from app.models import Data
+
+
+def packed_enabled():
+    return current_app.config.get("NEIGHBOR_STORAGE", "packed") == "packed"
+
+
+def pack(neighbors):
+    """Results column values for a list of KNN neighbor dicts."""
+    if not neighbors:
+        return {}
+    # Deferred so numpy isn't loaded at app startup
+    from app.services.knn_engine import STRANDS, UNKNOWN_STRAND
+
+    codes = {s: i for i, s in enumerate(STRANDS)}
+    return {
+        "neighbor_data_ids": [n["data_id"] for n in neighbors],
+        "neighbor_distances": [n["distance"] for n in neighbors],
+        "neighbor_strands": [codes.get(n["strand"], UNKNOWN_STRAND) for n in neighbors],
+    }
+
+
+def neighbor_rows(results_id, neighbors):
+    """Neighbors table rows for "rows" mode."""
+    return [
+        {
+            "results_id": results_id,
+            "neighbor_index": n["neighbor_index"],
+            "strand": n["strand"],
+            "distance": n["distance"],
+        }
+        for n in neighbors
+    ]
+
+
+def unpack(result):
+    """Neighbor dicts from a result's packed columns, or None if it has none."""
+    if result.neighbor_data_ids is None:
+        return None
+    from app.services.knn_engine import STRANDS, UNKNOWN_STRAND
+
+    strands = [STRANDS[c] if c < UNKNOWN_STRAND else None for c in result.neighbor_strands]
+    if None in strands:
+        # Strands outside STRANDS aren't coded; read them from the Data rows
+        unknown = [i for i, c in zip(result.neighbor_data_ids, result.neighbor_strands) if c >= UNKNOWN_STRAND]
+        labels = dict(db.session.query(Data.data_id, Data.strand).filter(Data.data_id.in_(unknown)))
+        strands = [s if s is not None else labels.get(i) for s, i in zip(strands, result.neighbor_data_ids)]
+
+    return [
+        {
+            "neighbor_index": rank,
+            "data_id": data_id,
+            "strand": strand,
+            "distance": float(distance),
+        }
+        for rank, (data_id, strand, distance) in enumerate(
+            zip(result.neighbor_data_ids, strands, result.neighbor_distances), start=1
+        )
+    ]
+
+
+def stored_neighbors(result):
+    """Packed neighbors if present, else the result's Neighbors rows (may be empty).
+
+    ``neighbor_index`` is always the 1-based rank. Older Neighbors rows stored
+    the training row there instead, so rows are ranked by (distance, insert order).
+    """
+    packed = unpack(result)
+    if packed is not None:
+        return packed
+    rows = sorted(result.neighbors, key=lambda n: (n.distance, n.neighbors_id))
+    return [
+        {
+            "neighbors_id": n.neighbors_id,
+            "neighbor_index": rank,
+            "strand": n.strand,
+            "distance": float(n.distance) if n.distance is not None else None,
+        }
+        for rank, n in enumerate(rows, start=1)
+    ]
@@ -0,0 +1,105 @@
+# app/services/passwords.py
+"""Argon2 hashing, with verification on a bounded worker pool.
+
+A login storm would otherwise put every request thread on Argon2 at once.
+``verify`` runs on PASSWORD_WORKERS threads (argon2-cffi releases the GIL, so
+they hash in parallel) and refuses new work with ``Overloaded`` once
+PASSWORD_QUEUE_SIZE checks are already waiting, so the caller can answer 503
+straight away instead of queueing behind the storm.
+
+Hashes made with older ARGON2_* parameters are re-hashed on the next
+successful login, which is how cost changes roll out.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from argon2 import PasswordHasher
+from app.services import metrics
+
+VERIFY_SECONDS = metrics.histogram(
+    "password_verify_seconds", "Time spent in Argon2 verify, including any rehash.",
+)
+QUEUE_WAIT_SECONDS = metrics.histogram(
+    "password_queue_wait_seconds", "Time a password check waited for a worker.",
+)
+REJECTED = metrics.counter(
+    "password_verify_rejected_total", "Password checks refused because the pool was saturated.",
+    labelnames=("reason",),
+)
+
+
+class Overloaded(Exception):
+    """Too many password checks are already queued, or this one waited too long."""
+
+
+hasher = PasswordHasher()
+_executor = None
+_slots = None  # running + queued checks
+_timeout = None
+
+
+def configure(time_cost, memory_cost, parallelism):
+    """Set the Argon2 parameters; also the initializer for spawned hashing processes."""
+    global hasher
+    hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+
+
+def parameters():
+    return hasher.time_cost, hasher.memory_cost, hasher.parallelism
+
+
+def init_app(app):
+    global _executor, _slots, _timeout
+    configure(
+        app.config.get("ARGON2_TIME_COST", 3),
+        app.config.get("ARGON2_MEMORY_COST", 65536),
+        app.config.get("ARGON2_PARALLELISM", 4),
+    )
+    workers = app.config.get("PASSWORD_WORKERS", 4)
+    _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+    _slots = threading.BoundedSemaphore(workers + app.config.get("PASSWORD_QUEUE_SIZE", 64))
+    _timeout = app.config.get("PASSWORD_VERIFY_TIMEOUT", 5)
+
+
+def hash_password(password):
+    return hasher.hash(password)
+
+
+def _check(stored_hash, password, queued_at):
+    started = time.perf_counter()
+    QUEUE_WAIT_SECONDS.observe(started - queued_at)
+    try:
+        try:
+            hasher.verify(stored_hash, password)
+        except Exception:
+            # Wrong password, or a legacy/malformed hash argon2 can't read
+            return False, None
+        new_hash = hasher.hash(password) if hasher.check_needs_rehash(stored_hash) else None
+        return True, new_hash
+    finally:
+        VERIFY_SECONDS.observe(time.perf_counter() - started)
+
+
+def verify(stored_hash, password):
+    """Check ``password`` against ``stored_hash`` on the worker pool.
+
+    Returns ``(ok, new_hash)``; ``new_hash`` is set when the password was
+    right but ``stored_hash`` used outdated parameters, and should be saved.
+    Raises ``Overloaded`` if the pool is saturated.
+    """
+    if not _slots.acquire(blocking=False):
+        REJECTED.inc(reason="queue_full")
+        raise Overloaded("Too many password checks in progress")
+    try:
+        future = _executor.submit(_check, stored_hash, password, time.perf_counter())
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda f: _slots.release())
+
+    try:
+        return future.result(timeout=_timeout)
+    except FutureTimeout:
+        future.cancel()
+        REJECTED.inc(reason="timeout")
+        raise Overloaded("Timed out waiting for a password check")
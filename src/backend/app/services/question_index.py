@@ -0,0 +1,65 @@
+# app/services/question_index.py
+"""Cached question_id -> strand map and question count per question set."""
+import threading
+from typing import NamedTuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from app.models import Question
+from app.services import cache_bus
+
+
+class QuestionIndex(NamedTuple):
+    strands: dict   # question_id -> strand
+    total: int
+
+
+_sets = {}
+_lock = threading.Lock()
+
+
+def get_question_index(set_id):
+    index = _sets.get(set_id)
+    if index is not None:
+        return index
+
+    rows = (
+        db.session.query(Question.question_id, Question.strand)
+        .filter(Question.set_id == set_id)
+        .all()
+    )
+    index = QuestionIndex({r.question_id: r.strand for r in rows}, len(rows))
+    with _lock:
+        _sets[set_id] = index
+    return index
+
+
+def invalidate(set_id=None):
+    with _lock:
+        if set_id is None:
+            _sets.clear()
+        else:
+            _sets.pop(set_id, None)
+
+
+cache_bus.subscribe("question_set", invalidate)
+
+
+# ---------------- Session hooks ----------------
+@event.listens_for(Session, "after_flush")
+def _collect_changed_sets(session, flush_context):
+    stale = session.info.setdefault("stale_question_sets", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Question) and obj.set_id is not None:
+            stale.add(obj.set_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_changed_sets(session):
+    for set_id in session.info.pop("stale_question_sets", ()):
+        invalidate(set_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changed_sets(session, previous_transaction):
+    session.info.pop("stale_question_sets", None)
@@ -0,0 +1,33 @@
+# app/services/rate_limit.py
+"""In-process token-bucket rate limiting."""
+import threading
+import time
+from app.services.cache import LRUCache
+
+
+class TokenBucketLimiter:
+    """One bucket per key, refilled at ``rate`` tokens a second up to ``burst``.
+
+    Buckets live in an LRU, so an evicted key simply starts full again.
+    """
+
+    def __init__(self, rate, burst, maxsize=100_000):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = LRUCache(maxsize)  # key -> (tokens, monotonic time)
+        self._lock = threading.Lock()
+
+    def _tokens(self, key, now):
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - updated) * self.rate)
+
+    def retry_after(self, key):
+        """Seconds until ``key`` has a token again; 0 if it has one now."""
+        with self._lock:
+            tokens = self._tokens(key, time.monotonic())
+        return 0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def consume(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self._buckets.set(key, (max(self._tokens(key, now) - 1, 0), now))
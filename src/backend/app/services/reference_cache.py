@@ -0,0 +1,72 @@
+# app/services/reference_cache.py
+"""Short-lived cache for the reference data every student reads at exam start.
+
+Active dataset, courses and question sets change rarely. Their serialized
+responses are kept for REFERENCE_CACHE_TTL seconds, rebuilt by one request
+at a time, and evicted as soon as an admin handler publishes a change.
+"""
+from flask import current_app
+from app.services import cache_bus
+from app.services.cache import TTLCache
+from app.services.http_cache import serialize
+
+DEFAULT_SIZE = 256
+DEFAULT_TTL = 60
+
+ACTIVE_DATASET = "active-dataset"
+COURSES = "courses"
+
+_cache = TTLCache(DEFAULT_SIZE, DEFAULT_TTL)
+
+
+def question_set_key(set_id):
+    return ("question-set", set_id)
+
+
+def questions_key(set_id):
+    return ("question-set-questions", set_id)
+
+
+def cached(key, build):
+    """The CachedBody for ``key``; ``build()`` returns (value, last_modified) or None."""
+    _cache.maxsize = current_app.config.get("REFERENCE_CACHE_SIZE", DEFAULT_SIZE)
+    _cache.ttl = current_app.config.get("REFERENCE_CACHE_TTL", DEFAULT_TTL)
+
+    def load():
+        built = build()
+        if built is None:
+            return None
+        value, last_modified = built
+        return serialize(value, last_modified)
+
+    return _cache.get_or_build(key, load)
+
+
+def evict(key=None):
+    if key is None:
+        _cache.clear()
+    else:
+        _cache.pop(key)
+
+
+def _courses_changed(key=None):
+    evict(COURSES)
+
+
+def _dataset_changed(data_set_id=None):
+    evict(ACTIVE_DATASET)
+
+
+def _question_set_changed(set_id=None):
+    # The active dataset payload embeds its question set's name
+    evict(ACTIVE_DATASET)
+    if set_id is None:
+        evict()
+    else:
+        evict(question_set_key(set_id))
+        evict(questions_key(set_id))
+
+
+cache_bus.subscribe("courses", _courses_changed)
+cache_bus.subscribe("dataset", _dataset_changed)
+cache_bus.subscribe("question_set", _question_set_changed)
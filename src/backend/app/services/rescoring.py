@@ -0,0 +1,121 @@
+# app/services/rescoring.py
+"""Re-score every completed assessment of a dataset in bulk."""
+import numpy as np
+from sqlalchemy import delete, insert, select
+from app import db
+from app.models import Assessment, Neighbors, Results, TieTable
+from app.services import cache_bus, model_registry, neighbor_storage
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def rescore_dataset(data_set_id, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Replace the Results/Neighbors/TieTable rows of all completed assessments.
+
+    Scores come from the stored strand totals, one chunk of assessments at a
+    time, and each chunk is written and committed on its own. ``progress`` is
+    called as ``progress(done, total)`` after every chunk.
+    """
+    model = model_registry.get_model(data_set_id)
+
+    total = (
+        db.session.query(Assessment.assessment_id)
+        .filter(Assessment.data_set_id == data_set_id, Assessment.completed)
+        .count()
+    )
+    if progress:
+        progress(0, total)
+
+    done = 0
+    last_id = 0
+    while True:
+        rows = db.session.execute(completed_page_query(data_set_id, last_id, chunk_size)).all()
+        if not rows:
+            break
+
+        assessment_ids = [r.assessment_id for r in rows]
+        samples = np.array([[r.stem_total, r.abm_total, r.humss_total] for r in rows])
+        batch = model.predict_batch(samples)
+        scored = [model.result_at(batch, i) for i in range(len(rows))]
+
+        _delete_results(assessment_ids)
+        _insert_results(assessment_ids, scored)
+        # Core inserts/deletes bypass the ORM hooks that evict cached payloads
+        cache_bus.publish("results", None)
+        db.session.commit()
+
+        done += len(rows)
+        last_id = assessment_ids[-1]
+        if progress:
+            progress(done, total)
+
+    return {"data_set_id": data_set_id, "rescored": done}
+
+
+def completed_page_query(data_set_id, after_id, chunk_size=DEFAULT_CHUNK_SIZE):
+    """The next ``chunk_size`` completed assessments of a dataset after ``after_id``.
+
+    Filters on bare ``completed`` so the plan matches the partial index
+    ix_assessments_completed_data_set_id; ``completed IS true`` doesn't.
+    """
+    return (
+        select(
+            Assessment.assessment_id,
+            Assessment.stem_total,
+            Assessment.abm_total,
+            Assessment.humss_total,
+        )
+        .where(
+            Assessment.data_set_id == data_set_id,
+            Assessment.completed,
+            Assessment.assessment_id > after_id,
+        )
+        .order_by(Assessment.assessment_id)
+        .limit(chunk_size)
+    )
+
+
+def _delete_results(assessment_ids):
+    stale = select(Results.results_id).where(Results.assessment_id.in_(assessment_ids))
+    db.session.execute(delete(Neighbors).where(Neighbors.results_id.in_(stale)))
+    db.session.execute(delete(TieTable).where(TieTable.results_id.in_(stale)))
+    db.session.execute(delete(Results).where(Results.assessment_id.in_(assessment_ids)))
+
+
+def _insert_results(assessment_ids, scored):
+    packed = neighbor_storage.packed_enabled()
+    result_rows = [
+        {
+            "stem_score": r["stem_score"],
+            "abm_score": r["abm_score"],
+            "humss_score": r["humss_score"],
+            "recommendation_description": f"Recommended strand: {r['recommendation']}",
+            "tie": r["tie"],
+            "assessment_id": assessment_id,
+            "recommended_strand": r["recommendation"],
+            **(neighbor_storage.pack(r["neighbors"]) if packed else {}),
+        }
+        for assessment_id, r in zip(assessment_ids, scored)
+    ]
+    results_ids = db.session.execute(
+        insert(Results).returning(Results.results_id, sort_by_parameter_order=True),
+        result_rows,
+    ).scalars().all()
+
+    neighbor_rows = []
+    tie_rows = []
+    for results_id, r in zip(results_ids, scored):
+        if not packed:
+            neighbor_rows.extend(neighbor_storage.neighbor_rows(results_id, r["neighbors"]))
+        if r["tie"] and r["tie_strands"]:
+            tie_rows.append({
+                "results_id": results_id,
+                "stem_weight": r["tie_strands"].get("stem_weight", 0),
+                "humss_weight": r["tie_strands"].get("humss_weight", 0),
+                "abm_weight": r["tie_strands"].get("abm_weight", 0),
+            })
+
+    if neighbor_rows:
+        db.session.execute(insert(Neighbors), neighbor_rows)
+    if tie_rows:
+        db.session.execute(insert(TieTable), tie_rows)
@@ -0,0 +1,71 @@
+# app/services/result_cache.py
+"""Serialized GET /results payloads of completed assessments.
+
+Results don't change once written, so each payload is serialized once, kept
+in an LRU keyed by assessment_id and served with a strong ETag. Entries are
+evicted when an assessment's results, completion state or dataset change, on
+this node right after the commit and on the others through cache_bus.
+"""
+from typing import NamedTuple
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.models import Assessment, DataSet, Results
+from app.services import cache_bus
+from app.services.cache import LRUCache
+from app.services.http_cache import CachedBody, serialize
+
+DEFAULT_SIZE = 2048
+
+
+class CachedResult(NamedTuple):
+    results_id: int
+    payload: CachedBody
+    neighbors: CachedBody
+
+
+_cache = LRUCache(DEFAULT_SIZE)
+
+
+def get(assessment_id):
+    return _cache.get(assessment_id)
+
+
+def put(assessment_id, results_id, payload, neighbors):
+    """Serialize a results payload (and its neighbors list) and cache it."""
+    _cache.maxsize = current_app.config.get("RESULTS_CACHE_SIZE", DEFAULT_SIZE)
+    entry = CachedResult(results_id, serialize(payload), serialize(neighbors))
+    _cache.set(assessment_id, entry)
+    return entry
+
+
+def evict(assessment_id=None):
+    if assessment_id is None:
+        _cache.clear()
+    else:
+        _cache.pop(assessment_id)
+
+
+def _evict_all(key=None):
+    evict()
+
+
+cache_bus.subscribe("results", evict)
+# Dataset names and lookup-cube neighbors come from the dataset's current state
+cache_bus.subscribe("dataset", _evict_all)
+
+
+# ---------------- Session hooks ----------------
+@event.listens_for(Session, "after_flush")
+def _publish_changed_results(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Results) and obj.assessment_id is not None:
+            cache_bus.publish("results", obj.assessment_id, session=session)
+        elif isinstance(obj, Assessment) and (
+            obj in session.deleted or inspect(obj).attrs.completed.history.has_changes()
+        ):
+            cache_bus.publish("results", obj.assessment_id, session=session)
+        elif isinstance(obj, DataSet) and (
+            obj in session.deleted or inspect(obj).attrs.data_set_name.history.has_changes()
+        ):
+            cache_bus.publish("results", None, session=session)
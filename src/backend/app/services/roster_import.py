@@ -0,0 +1,173 @@
+# app/services/roster_import.py
+"""Create many user accounts at once from a class roster CSV.
+
+Rows are validated up front, emails are checked against user_data in one
+query, passwords are hashed across a process pool, and the accounts are
+inserted with a single COPY. Bad rows don't stop the import; they come back
+in ``errors`` with their 1-based file row.
+"""
+import csv
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from sqlalchemy import func, insert, text
+from app import db
+from app.models import User
+from app.services import passwords
+
+REQUIRED_COLUMNS = ("email", "password", "first_name", "last_name", "birthday")
+INSERT_COLUMNS = ("email", "password", "first_name", "last_name", "middle_name", "affix", "birthday", "role")
+# Below this many passwords a pool costs more to start than it saves.
+MIN_POOL_SIZE = 32
+PROGRESS_EVERY = 100
+
+STAGING_SQL = """
+CREATE TEMP TABLE roster_staging (
+    email VARCHAR(120), password VARCHAR(255), first_name VARCHAR(100),
+    last_name VARCHAR(100), middle_name VARCHAR(100), affix VARCHAR(50),
+    birthday DATE, role VARCHAR(50)
+) ON COMMIT DROP
+"""
+COPY_SQL = f"COPY roster_staging ({', '.join(INSERT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+# A signup can claim an email between our check and the insert; skip it then.
+MERGE_SQL = f"""
+INSERT INTO user_data ({', '.join(INSERT_COLUMNS)})
+SELECT {', '.join(INSERT_COLUMNS)} FROM roster_staging
+ON CONFLICT (email) DO NOTHING
+RETURNING email
+"""
+
+
+def hash_passwords(plaintexts, workers=None, progress=None):
+    """Argon2-hash ``plaintexts`` in order, across ``workers`` processes."""
+    if len(plaintexts) < MIN_POOL_SIZE or workers == 1:
+        return [passwords.hash_password(p) for p in plaintexts]
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(PROGRESS_EVERY, len(plaintexts) // (workers * 4)))
+    hashed = []
+    # Spawn rather than fork: this runs on a jobs thread next to the mail,
+    # Argon2 and cache-listener threads. Children get the configured cost.
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=ctx,
+        initializer=passwords.configure, initargs=passwords.parameters(),
+    ) as pool:
+        for h in pool.map(passwords.hash_password, plaintexts, chunksize=chunksize):
+            hashed.append(h)
+            if progress and len(hashed) % PROGRESS_EVERY == 0:
+                progress(len(hashed), len(plaintexts))
+    return hashed
+
+
+def parse_roster(source):
+    """Return ``(rows, errors)`` from a roster CSV path or text/binary file object."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline="", encoding="utf-8-sig") as f:
+            return parse_roster(f)
+    if isinstance(source.read(0), bytes):
+        source = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+
+    reader = csv.DictReader(source, skipinitialspace=True)
+    reader.fieldnames = [str(c).strip().lower() for c in reader.fieldnames or ()]
+    missing = [c for c in REQUIRED_COLUMNS if c not in reader.fieldnames]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+
+    rows, errors, seen = [], [], {}
+    # Row 1 is the header.
+    for line, record in enumerate(reader, start=2):
+        record = {k: (v or "").strip() for k, v in record.items() if k}
+        email = record["email"]
+        empty = [c for c in REQUIRED_COLUMNS if not record[c]]
+        if empty:
+            errors.append({"row": line, "email": email, "error": f"Missing {', '.join(empty)}"})
+            continue
+        if "@" not in email:
+            errors.append({"row": line, "email": email, "error": "Invalid email"})
+            continue
+        try:
+            birthday = datetime.strptime(record["birthday"], "%Y-%m-%d").date()
+        except ValueError:
+            errors.append({"row": line, "email": email, "error": "birthday must be YYYY-MM-DD"})
+            continue
+        if email.lower() in seen:
+            errors.append({"row": line, "email": email, "error": f"Duplicate of row {seen[email.lower()]}"})
+            continue
+        seen[email.lower()] = line
+
+        rows.append({
+            "row": line,
+            "email": email,
+            "password": record["password"],
+            "first_name": record["first_name"],
+            "last_name": record["last_name"],
+            "middle_name": record.get("middle_name") or None,
+            "affix": record.get("affix") or None,
+            "birthday": birthday,
+            "role": "USER",
+        })
+    return rows, errors
+
+
+def import_roster(source, workers=None, progress=None):
+    """Create a USER account for every valid, unregistered row of ``source``.
+
+    ``progress(done, total)`` follows password hashing, the slow step.
+    Returns ``{"created", "errors"}``; ``created`` counts inserted accounts and
+    ``errors`` lists the rows that were skipped and why.
+    """
+    rows, errors = parse_roster(source)
+
+    if rows:
+        # One set-based lookup instead of a query per row
+        registered = {
+            email.lower() for (email,) in db.session.query(User.email).filter(
+                func.lower(User.email).in_([r["email"].lower() for r in rows])
+            )
+        }
+        fresh = []
+        for r in rows:
+            if r["email"].lower() in registered:
+                errors.append({"row": r["row"], "email": r["email"], "error": "Email already registered"})
+            else:
+                fresh.append(r)
+        rows = fresh
+    if progress:
+        progress(0, len(rows))
+
+    for r, hashed in zip(rows, hash_passwords([r["password"] for r in rows], workers, progress)):
+        r["password"] = hashed
+
+    created = 0
+    try:
+        if rows and db.engine.dialect.name == "postgresql":
+            created = _copy_users(rows, errors)
+        elif rows:
+            db.session.execute(insert(User), [{c: r[c] for c in INSERT_COLUMNS} for r in rows])
+            created = len(rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if progress:
+        progress(len(rows), len(rows))
+
+    errors.sort(key=lambda e: e["row"])
+    return {"created": created, "errors": errors}
+
+
+def _copy_users(rows, errors):
+    db.session.execute(text(STAGING_SQL))
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([r[c] for c in INSERT_COLUMNS] for r in rows)
+    buffer.seek(0)
+    db.session.connection().connection.cursor().copy_expert(COPY_SQL, buffer)
+
+    inserted = {email for (email,) in db.session.execute(text(MERGE_SQL))}
+    for r in rows:
+        if r["email"] not in inserted:
+            errors.append({"row": r["row"], "email": r["email"], "error": "Email already registered"})
+    return len(inserted)
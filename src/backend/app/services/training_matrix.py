@@ -0,0 +1,146 @@
+# app/services/training_matrix.py
+"""Compact, array-backed training data for the KNN layer."""
+import numpy as np
+from sqlalchemy import select
+from app import db
+from app.models import Data
+from app.services.knn_engine import STRANDS
+
+LOAD_BATCH = 10_000
+# Search distinct points instead of raw rows once duplicates shrink the
+# index to at most this fraction of the rows.
+DEDUP_RATIO = 0.5
+
+
+class TrainingMatrix:
+    """Training rows as one contiguous integer matrix plus uint8 strand codes.
+
+    ``features`` is (M, 3) in stem/abm/humss order, ``codes`` indexes into
+    ``labels`` and ``data_ids`` holds each row's Data.data_id. The first
+    labels are always STRANDS, so codes 0-2 line up with knn_engine; any
+    other strand found in the data gets a later code and never receives a
+    vote.
+    """
+
+    __slots__ = ("features", "codes", "labels", "data_ids")
+
+    def __init__(self, features, codes, labels, data_ids):
+        self.features = features
+        self.codes = codes
+        self.labels = tuple(labels)
+        self.data_ids = data_ids
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self):
+        return self.features.nbytes + self.codes.nbytes + self.data_ids.nbytes
+
+    def strand(self, index):
+        return self.labels[self.codes[index]]
+
+    def deduplicate(self):
+        """Collapse identical score rows into DedupedPoints."""
+        points, inverse = np.unique(self.features, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        members = np.argsort(inverse, kind="stable").astype(np.int32)
+        offsets = np.zeros(len(points) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(inverse, minlength=len(points)), out=offsets[1:])
+        return DedupedPoints(points, offsets, members)
+
+    @classmethod
+    def from_lists(cls, dataset_list, strand_list, data_ids=None):
+        """Build from plain lists; without ``data_ids`` rows are numbered from 1."""
+        labels = list(STRANDS)
+        lookup = {s: i for i, s in enumerate(labels)}
+        codes = np.empty(len(strand_list), dtype=np.uint8)
+        for i, strand in enumerate(strand_list):
+            codes[i] = _code_for(strand, labels, lookup)
+        features = _compact(np.asarray(dataset_list, dtype=np.int64).reshape(-1, 3))
+        if data_ids is None:
+            data_ids = np.arange(1, len(codes) + 1)
+        return cls(features, codes, labels, np.asarray(data_ids, dtype=np.int32))
+
+    @classmethod
+    def load(cls, data_set_id):
+        """Load a dataset's rows with a column-only query, ordered by data_id."""
+        query = training_rows_query(data_set_id)
+        labels = list(STRANDS)
+        lookup = {s: i for i, s in enumerate(labels)}
+        feature_parts, code_parts, id_parts = [], [], []
+
+        result = db.session.execute(query.execution_options(yield_per=LOAD_BATCH))
+        for rows in result.partitions():
+            feature_parts.append(np.array([r[:3] for r in rows], dtype=np.int64))
+            code_parts.append(np.fromiter(
+                (_code_for(r[3], labels, lookup) for r in rows),
+                dtype=np.uint8, count=len(rows),
+            ))
+            id_parts.append(np.fromiter((r[4] for r in rows), dtype=np.int32, count=len(rows)))
+
+        if not feature_parts:
+            return cls(
+                np.empty((0, 3), dtype=np.int16), np.empty(0, dtype=np.uint8), labels,
+                np.empty(0, dtype=np.int32),
+            )
+        features = _compact(np.concatenate(feature_parts))
+        codes = np.concatenate(code_parts)
+        data_ids = np.concatenate(id_parts)
+        if np.any(data_ids[1:] < data_ids[:-1]):
+            order = np.argsort(data_ids, kind="stable")
+            features, codes, data_ids = features[order], codes[order], data_ids[order]
+        return cls(features, codes, labels, data_ids)
+
+
+def training_rows_query(data_set_id):
+    """A dataset's training rows, unordered.
+
+    ``TrainingMatrix.load`` sorts by data_id itself: with ORDER BY the planner
+    walks data_pkey whenever one dataset fills most of the table, instead of
+    ix_data_data_set_id_data_id.
+    """
+    return (
+        select(Data.stem_score, Data.abm_score, Data.humss_score, Data.strand, Data.data_id)
+        .where(Data.data_set_id == data_set_id)
+    )
+
+
+class DedupedPoints:
+    """Distinct score vectors of a TrainingMatrix and the rows behind each.
+
+    ``members[offsets[p]:offsets[p + 1]]`` lists the rows at ``points[p]`` in
+    ascending order so the neighbor search can reproduce raw-row tie ordering.
+    """
+
+    __slots__ = ("points", "offsets", "members")
+
+    def __init__(self, points, offsets, members):
+        self.points = points
+        self.offsets = offsets
+        self.members = members
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def nbytes(self):
+        return self.points.nbytes + self.offsets.nbytes + self.members.nbytes
+
+
+def _code_for(strand, labels, lookup):
+    code = lookup.get(strand)
+    if code is None:
+        if len(labels) >= 255:
+            raise ValueError("Too many distinct strands in dataset")
+        code = lookup[strand] = len(labels)
+        labels.append(strand)
+    return code
+
+
+def _compact(features):
+    """Store scores as int16 when they fit, int32 otherwise."""
+    info = np.iinfo(np.int16)
+    if features.size == 0 or (features.min() >= info.min and features.max() <= info.max):
+        return np.ascontiguousarray(features, dtype=np.int16)
+    return np.ascontiguousarray(features, dtype=np.int32)
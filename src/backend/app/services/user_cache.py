@@ -0,0 +1,54 @@
+# app/services/user_cache.py
+"""Short-lived cache of serialized user profiles for authenticated polling.
+
+/me and /profile are hit on every page load; the profile is kept for
+USER_CACHE_TTL seconds and evicted as soon as the user row changes, on this
+node right after the commit and on the others through cache_bus.
+"""
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from app.models import User
+from app.services import cache_bus
+from app.services.cache import TTLCache
+from app.services.http_cache import serialize
+
+DEFAULT_SIZE = 4096
+DEFAULT_TTL = 30
+
+_cache = TTLCache(DEFAULT_SIZE, DEFAULT_TTL)
+
+
+def profile(user_id):
+    """The user's serialized ``user_info()``, or None if there is no such user."""
+    _cache.maxsize = current_app.config.get("USER_CACHE_SIZE", DEFAULT_SIZE)
+    _cache.ttl = current_app.config.get("USER_CACHE_TTL", DEFAULT_TTL)
+
+    def build():
+        user = db.session.get(User, user_id)
+        return serialize(user.user_info()) if user else None
+
+    return _cache.get_or_build(user_id, build)
+
+
+def exists(user_id):
+    return profile(user_id) is not None
+
+
+def evict(user_id=None):
+    if user_id is None:
+        _cache.clear()
+    else:
+        _cache.pop(user_id)
+
+
+cache_bus.subscribe("user", evict)
+
+
+# ---------------- Session hooks ----------------
+@event.listens_for(Session, "after_flush")
+def _publish_changed_users(session, flush_context):
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, User) and obj.user_id is not None:
+            cache_bus.publish("user", obj.user_id, session=session)
@@ -1,25 +1,20 @@
 import os
 import random
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import ssl
 import certifi
+from app.services import mail_queue
 
-# --- Load config ---
-SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
-SENDER_EMAIL = os.getenv("SENDER_EMAIL")
-APP_PASSWORD = os.getenv("APP_PASSWORD")  # Only for SMTP
-SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
+SUBJECT = "🔑 Strandify - Verify Your Email"
 
 # --- Set SSL environment for local dev (optional, helps cert verification) ---
 os.environ['SSL_CERT_FILE'] = certifi.where()
 os.environ['REQUESTS_CA_BUNDLE'] = certifi.where()
 
 
-def verify_email(email: str) -> str | None:
+def verify_email(email: str) -> tuple[str, str] | tuple[None, None]:
+    """Queue an OTP email; returns ``(otp, delivery_id)``, or ``(None, None)`` if the mail queue is full.
 
+    Poll ``mail_queue.status(delivery_id)`` to see whether it was delivered.
+    """
     otp = str(random.randint(100000, 999999))
 
     html_content = f"""
@@ -52,41 +47,8 @@ def verify_email(email: str) -> str | None:
     </html>
     """
 
-    # --- Use SendGrid API if key is available ---
-    if SENDGRID_API_KEY:
-        try:
-            from sendgrid import SendGridAPIClient
-            from sendgrid.helpers.mail import Mail
-
-            message = Mail(
-                from_email=SENDER_EMAIL,
-                to_emails=email,
-                subject="🔑 Strandify - Verify Your Email",
-                html_content=html_content
-            )
-            sg = SendGridAPIClient(SENDGRID_API_KEY)
-            sg.send(message)
-            return otp
-        except Exception as e:
-            print("SendGrid error:", e)
-            return None
-
-    # --- Fallback to SMTP (local dev) ---
-    else:
-        try:
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = "🔑 Strandify - Verify Your Email"
-            msg["From"] = SENDER_EMAIL
-            msg["To"] = email
-            msg.attach(MIMEText(html_content, "html"))
-
-            context = ssl.create_default_context(cafile=certifi.where())
-            with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-                server.starttls(context=context)
-                server.login(SENDER_EMAIL, APP_PASSWORD)
-                server.sendmail(SENDER_EMAIL, [email], msg.as_string())
-
-            return otp
-        except Exception as e:
-            print("SMTP error:", e)
-            return None
+    delivery_id = mail_queue.submit(email, SUBJECT, html_content)
+    if delivery_id is None:
+        print("Mail queue full, OTP not sent to", email)
+        return None, None
+    return otp, delivery_id
@@ -0,0 +1,48 @@
+"""Indexes for the hot read paths.
+
+answers.assessment_id and neighbors.results_id are already covered by the
+leading column of uq_assessment_question and uq_result_neighbor.
+
+Indexes are built CONCURRENTLY on PostgreSQL so live tables stay writable.
+
+Revision ID: 0002_hot_path_indexes
+Revises: 0001_initial_schema
+Create Date: 2026-10-18 12:02:41.045239
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_hot_path_indexes'
+down_revision = '0001_initial_schema'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_questions_set_id', 'questions', ['set_id'], None),
+    ('ix_data_data_set_id_data_id', 'data', ['data_set_id', 'data_id'], None),
+    ('ix_data_set_active', 'data_set', ['data_set_id'], "status = 'Active'"),
+    ('ix_assessments_user_id_data_set_id', 'assessments', ['user_id', 'data_set_id'], None),
+    ('ix_assessments_completed_data_set_id', 'assessments', ['data_set_id', 'assessment_id'], 'completed'),
+    ('ix_results_assessment_id', 'results', ['assessment_id'], None),
+    ('ix_tie_table_results_id', 'tie_table', ['results_id'], None),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False, if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,31 @@
+"""Packed neighbor arrays on results.
+
+Revision ID: 0003_packed_result_neighbors
+Revises: 0002_hot_path_indexes
+Create Date: 2026-10-18 12:20:05.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_packed_result_neighbors'
+down_revision = '0002_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('results', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('neighbor_data_ids', postgresql.ARRAY(sa.Integer()), nullable=True))
+        batch_op.add_column(sa.Column('neighbor_distances', postgresql.ARRAY(sa.Float()), nullable=True))
+        batch_op.add_column(sa.Column('neighbor_strands', postgresql.ARRAY(sa.SmallInteger()), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('results', schema=None) as batch_op:
+        batch_op.drop_column('neighbor_strands')
+        batch_op.drop_column('neighbor_distances')
+        batch_op.drop_column('neighbor_data_ids')
@@ -0,0 +1,46 @@
+"""Answered count and question set on assessments.
+
+Lets an answer autosave update progress from the assessment row alone.
+Existing rows are backfilled from their dataset and stored answers.
+
+Revision ID: 0004_assessment_answer_counts
+Revises: 0003_packed_result_neighbors
+Create Date: 2026-10-18 14:10:12.503117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_assessment_answer_counts'
+down_revision = '0003_packed_result_neighbors'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('assessments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('question_set_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('answered_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute("""
+        UPDATE assessments SET question_set_id = (
+            SELECT data_set.question_set_id FROM data_set
+            WHERE data_set.data_set_id = assessments.data_set_id
+        )
+    """)
+    op.execute("""
+        UPDATE assessments SET answered_count = (
+            SELECT count(*) FROM answers
+            JOIN questions ON questions.question_id = answers.question_id
+            WHERE answers.assessment_id = assessments.assessment_id
+              AND questions.set_id = assessments.question_set_id
+        )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('assessments', schema=None) as batch_op:
+        batch_op.drop_column('answered_count')
+        batch_op.drop_column('question_set_id')
@@ -1,9 +1,8 @@
-from app import create_app, db
+from app import create_app
 
 
+# The schema is managed with `flask --app run db upgrade`, not on every boot
 app = create_app()
-with app.app_context():
-    db.create_all()
 
 if __name__ == "__main__":
     
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+from app.services import neighbor_storage
+from app.services.KNN import KNN
+from app.services.training_matrix import TrainingMatrix
+
+SAMPLE = [11, 20, 30]
+
+
+def scored_neighbors():
+    matrix = TrainingMatrix.from_lists(
+        [[10, 20, 30], [40, 5, 9], [12, 18, 33], [11, 21, 29], [30, 30, 30], [11, 20, 30]],
+        ["STEM", "ABM", "HUMSS", "STEM", "ABM", "HUMSS"],
+        data_ids=[101, 102, 103, 104, 105, 106],
+    )
+    return KNN(matrix, 4).start_algorithm(SAMPLE)["neighbors"]
+
+
+def test_scored_neighbors_are_ranked():
+    neighbors = scored_neighbors()
+    assert [n["neighbor_index"] for n in neighbors] == [1, 2, 3, 4]
+    assert [n["data_id"] for n in neighbors] == [106, 101, 104, 103]
+
+
+def test_packed_neighbors_read_back_unchanged():
+    neighbors = scored_neighbors()
+    result = SimpleNamespace(**neighbor_storage.pack(neighbors))
+    assert neighbor_storage.stored_neighbors(result) == neighbors
+
+
+def test_neighbor_rows_read_back_with_the_same_ranks():
+    neighbors = scored_neighbors()
+    rows = neighbor_storage.neighbor_rows(7, neighbors)
+    result = SimpleNamespace(
+        neighbor_data_ids=None,
+        # Inserted in rank order, but the relationship doesn't promise an order
+        neighbors=[SimpleNamespace(neighbors_id=i, **row) for i, row in enumerate(rows, start=1)][::-1],
+    )
+    read = neighbor_storage.stored_neighbors(result)
+    assert [(n["neighbor_index"], n["strand"], n["distance"]) for n in read] == [
+        (n["neighbor_index"], n["strand"], n["distance"]) for n in neighbors
+    ]
@@ -0,0 +1,42 @@
+import json
+import os
+import subprocess
+import sys
+from app.commands import DEFAULT_STARTUP_BUDGET_MS, HEAVY_MODULES, _STARTUP_PROBE
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# create_app only needs these to be set, it doesn't connect at startup
+PLACEHOLDER_ENV = {
+    "SECRET_KEY": "test",
+    "SUPABASE_USER": "user",
+    "SUPABASE_PASSWORD": "password",
+    "SUPABASE_HOST": "localhost",
+    "SUPABASE_PORT": "5432",
+    "SUPABASE_DB": "pathfinder",
+    "CACHE_LISTENER_ENABLED": "false",
+}
+
+
+def probe_startup():
+    """Import and create the app in a fresh interpreter, as check-startup does."""
+    env = {**PLACEHOLDER_ENV, **os.environ}
+    probe = subprocess.run(
+        [sys.executable, "-c", _STARTUP_PROBE],
+        capture_output=True, text=True, cwd=BACKEND_DIR, env=env,
+    )
+    assert probe.returncode == 0, probe.stderr
+    return json.loads(probe.stdout.strip().splitlines()[-1])
+
+
+def test_startup_within_budget():
+    # Best of three cold starts, so one slow run on a busy machine doesn't fail it
+    best = min(probe_startup()["ms"] for _ in range(3))
+    assert best <= DEFAULT_STARTUP_BUDGET_MS, (
+        f"Startup took {best:.0f} ms, over the {DEFAULT_STARTUP_BUDGET_MS} ms budget"
+    )
+
+
+def test_startup_skips_heavy_modules():
+    modules = probe_startup()["modules"]
+    assert [m for m in HEAVY_MODULES if m in modules] == []